@@ -3,8 +3,9 @@ Bitget 多模式交易管理器
 支持模拟盘、实盘、双盘同步三种模式
 """
 import logging
-from typing import Dict, Any, List, Optional
-from bitget_trader_ccxt import BitgetTraderCCXT
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+from bitget_trader_ccxt import BitgetTraderCCXT, create_http_session
 
 
 class BitgetMultiModeTrader:
@@ -33,7 +34,8 @@ class BitgetMultiModeTrader:
                  demo_secret_key: Optional[str] = None,
                  demo_passphrase: Optional[str] = None,
                  # 通用配置
-                 scale_ratio: float = 0.1):
+                 scale_ratio: float = 0.1,
+                 markets_cache: Optional[str] = None):
         """
         初始化多模式交易管理器
         
@@ -46,6 +48,7 @@ class BitgetMultiModeTrader:
             demo_secret_key: 模拟盘 Secret Key
             demo_passphrase: 模拟盘 Passphrase
             scale_ratio: 交易量缩放比例
+            markets_cache: 市场信息磁盘缓存文件（可选，未过期时不再从交易所下载）
         """
         self.mode = mode
         self.scale_ratio = scale_ratio
@@ -54,10 +57,13 @@ class BitgetMultiModeTrader:
         self.live_trader = None
         self.demo_trader = None
         
+        # 模拟盘和实盘访问同一个 API 主机，共享一个连接池
+        session = create_http_session(pool_size=40 if mode == self.MODE_BOTH else 20)
+        
         # 根据模式初始化相应的交易器
         if mode == self.MODE_LIVE_ONLY or mode == self.MODE_BOTH:
             # 需要实盘交易器
-            if not all([live_api_key, live_secret_key, live_passphrase]):
+            if not (live_api_key and live_secret_key and live_passphrase):
                 raise ValueError("实盘模式需要配置实盘 API 密钥")
             
             self.logger.info("初始化实盘交易器...")
@@ -66,14 +72,15 @@ class BitgetMultiModeTrader:
                 secret_key=live_secret_key,
                 passphrase=live_passphrase,
                 scale_ratio=scale_ratio,
-                env_name='实盘'
+                env_name='实盘',
+                session=session,
+                markets_cache=markets_cache
             )
-            self.live_trader.load_markets()
             self.logger.info("✅ 实盘交易器初始化完成")
         
         if mode == self.MODE_DEMO_ONLY or mode == self.MODE_BOTH:
             # 需要模拟盘交易器
-            if not all([demo_api_key, demo_secret_key, demo_passphrase]):
+            if not (demo_api_key and demo_secret_key and demo_passphrase):
                 raise ValueError("模拟盘模式需要配置模拟盘 API 密钥")
             
             self.logger.info("初始化模拟盘交易器...")
@@ -82,9 +89,11 @@ class BitgetMultiModeTrader:
                 secret_key=demo_secret_key,
                 passphrase=demo_passphrase,
                 scale_ratio=scale_ratio,
-                env_name='模拟盘'
+                env_name='模拟盘',
+                # 沙盒返回的市场信息与实盘不同，模拟盘单独加载（磁盘缓存为 .demo 文件）
+                session=session,
+                markets_cache=markets_cache
             )
-            self.demo_trader.load_markets()
             self.logger.info("✅ 模拟盘交易器初始化完成")
         
         # 记录当前模式
@@ -94,6 +103,37 @@ class BitgetMultiModeTrader:
             self.MODE_BOTH: "双盘同步"
         }
         self.logger.info(f"🎯 交易模式: {mode_names.get(mode, '未知')} (mode={mode})")
+        
+        # 各环境是否参与执行（模式在初始化后不变，这里一次算好）
+        self._run_demo = self.demo_trader is not None and mode in (self.MODE_DEMO_ONLY, self.MODE_BOTH)
+        self._run_live = self.live_trader is not None and mode in (self.MODE_LIVE_ONLY, self.MODE_BOTH)
+        
+        # 双盘模式下模拟盘和实盘的请求并发发出，总耗时取两者较慢的一方
+        self._executor = None
+        if self._run_demo and self._run_live:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='bitget-multi')
+    
+    def _dispatch(self, action: Callable[[BitgetTraderCCXT], Any]) -> Dict[str, Any]:
+        """
+        在所有激活的环境上执行同一操作（双盘模式下并发执行）
+        
+        Args:
+            action: 接收交易器实例并返回结果的函数
+            
+        Returns:
+            各环境的执行结果 {'demo': ..., 'live': ...}
+        """
+        traders = {}
+        if self._run_demo:
+            traders['demo'] = self.demo_trader
+        if self._run_live:
+            traders['live'] = self.live_trader
+        
+        if self._executor:
+            futures = {env: self._executor.submit(action, trader) for env, trader in traders.items()}
+            return {env: future.result() for env, future in futures.items()}
+        
+        return {env: action(trader) for env, trader in traders.items()}
     
     def get_platform_name(self) -> str:
         """获取平台名称"""
@@ -106,29 +146,24 @@ class BitgetMultiModeTrader:
         Returns:
             成功返回 True，失败返回 False
         """
+        env_names = {'demo': '模拟盘', 'live': '实盘'}
         success = True
         
-        if self.live_trader:
-            self.logger.info("测试实盘连接...")
-            if not self.live_trader.test_connection():
-                self.logger.error("❌ 实盘连接测试失败")
-                success = False
-            else:
-                self.logger.info("✅ 实盘连接测试成功")
+        self.logger.info("测试连接...")
+        results = self._dispatch(lambda trader: trader.test_connection())
         
-        if self.demo_trader:
-            self.logger.info("测试模拟盘连接...")
-            if not self.demo_trader.test_connection():
-                self.logger.error("❌ 模拟盘连接测试失败")
+        for env, ok in results.items():
+            if not ok:
+                self.logger.error(f"❌ {env_names[env]}连接测试失败")
                 success = False
             else:
-                self.logger.info("✅ 模拟盘连接测试成功")
+                self.logger.info(f"✅ {env_names[env]}连接测试成功")
         
         return success
     
     def execute_trades(self, trades: List[Dict], dry_run: bool = False) -> Dict[str, Any]:
         """
-        执行交易（根据模式在不同环境下单）
+        执行交易（根据模式在不同环境下单，双盘模式下两个环境并发执行）
         
         Args:
             trades: 交易列表
@@ -137,41 +172,40 @@ class BitgetMultiModeTrader:
         Returns:
             执行结果字典，包含各环境的执行结果
         """
-        results = {}
-        
-        # 模拟盘执行
-        if self.demo_trader and (self.mode == self.MODE_DEMO_ONLY or self.mode == self.MODE_BOTH):
-            self.logger.info("=" * 60)
-            self.logger.info("📱 开始在模拟盘执行交易...")
-            self.logger.info("=" * 60)
-            demo_result = self.demo_trader.execute_trades(trades, dry_run=dry_run)
-            results['demo'] = demo_result
-            self.logger.info(f"模拟盘执行完成: 成功 {demo_result.get('success', 0)}, 失败 {demo_result.get('failed', 0)}")
-        
-        # 实盘执行
-        if self.live_trader and (self.mode == self.MODE_LIVE_ONLY or self.mode == self.MODE_BOTH):
-            self.logger.info("=" * 60)
-            self.logger.info("💰 开始在实盘执行交易...")
-            self.logger.info("=" * 60)
-            live_result = self.live_trader.execute_trades(trades, dry_run=dry_run)
-            results['live'] = live_result
-            self.logger.info(f"实盘执行完成: 成功 {live_result.get('success', 0)}, 失败 {live_result.get('failed', 0)}")
+        self.logger.info("=" * 60)
+        self.logger.info("🚀 开始执行交易...")
+        self.logger.info("=" * 60)
+        results = self._dispatch(lambda trader: trader.execute_trades(trades, dry_run=dry_run))
+        
+        if 'demo' in results:
+            demo_result = results['demo']
+            self.logger.info(f"模拟盘执行完成: 成功 {demo_result.get('success', 0)}, 失败 {demo_result.get('failed', 0)}, "
+                             f"熔断跳过 {demo_result.get('skipped', 0)}")
+        
+        if 'live' in results:
+            live_result = results['live']
+            self.logger.info(f"实盘执行完成: 成功 {live_result.get('success', 0)}, 失败 {live_result.get('failed', 0)}, "
+                             f"熔断跳过 {live_result.get('skipped', 0)}")
         
         # 汇总结果
-        total_success = sum(r.get('success', 0) for r in results.values())
-        total_failed = sum(r.get('failed', 0) for r in results.values())
+        total_success = total_failed = total_skipped = 0
+        for r in results.values():
+            total_success += r.get('success', 0)
+            total_failed += r.get('failed', 0)
+            total_skipped += r.get('skipped', 0)
         
         self.logger.info("")
         self.logger.info("=" * 60)
         self.logger.info(f"📊 多模式交易执行完成")
-        self.logger.info(f"   总成功: {total_success}, 总失败: {total_failed}")
+        self.logger.info(f"   总成功: {total_success}, 总失败: {total_failed}, 总熔断跳过: {total_skipped}")
         self.logger.info("=" * 60)
         
         return {
             'mode': self.mode,
             'results': results,
             'total_success': total_success,
-            'total_failed': total_failed
+            'total_failed': total_failed,
+            'total_skipped': total_skipped
         }
     
     def place_order(self, symbol: str, side: str, order_type: str, amount: float,
@@ -182,19 +216,11 @@ class BitgetMultiModeTrader:
         Returns:
             各环境的订单结果
         """
-        results = {}
-        
-        if self.demo_trader and (self.mode == self.MODE_DEMO_ONLY or self.mode == self.MODE_BOTH):
-            self.logger.info("📱 模拟盘下单...")
-            demo_order = self.demo_trader.place_order(symbol, side, order_type, amount, price, params)
-            results['demo'] = demo_order
-        
-        if self.live_trader and (self.mode == self.MODE_LIVE_ONLY or self.mode == self.MODE_BOTH):
-            self.logger.info("💰 实盘下单...")
-            live_order = self.live_trader.place_order(symbol, side, order_type, amount, price, params)
-            results['live'] = live_order
-        
-        return results
+        self.logger.info("📤 下单...")
+        # 每个环境使用独立的参数副本，避免并发时互相修改
+        return self._dispatch(lambda trader: trader.place_order(
+            symbol, side, order_type, amount, price, dict(params) if params else None
+        ))
     
     def get_position(self, symbol: str) -> Dict[str, Any]:
         """
@@ -203,17 +229,7 @@ class BitgetMultiModeTrader:
         Returns:
             各环境的持仓信息
         """
-        results = {}
-        
-        if self.demo_trader and (self.mode == self.MODE_DEMO_ONLY or self.mode == self.MODE_BOTH):
-            demo_position = self.demo_trader.get_position(symbol)
-            results['demo'] = demo_position
-        
-        if self.live_trader and (self.mode == self.MODE_LIVE_ONLY or self.mode == self.MODE_BOTH):
-            live_position = self.live_trader.get_position(symbol)
-            results['live'] = live_position
-        
-        return results
+        return self._dispatch(lambda trader: trader.get_position(symbol))
     
     def close_all_positions(self, symbol: str, side: Optional[str] = None) -> Dict[str, bool]:
         """
@@ -222,15 +238,5 @@ class BitgetMultiModeTrader:
         Returns:
             各环境的执行结果
         """
-        results = {}
-        
-        if self.demo_trader and (self.mode == self.MODE_DEMO_ONLY or self.mode == self.MODE_BOTH):
-            self.logger.info("📱 模拟盘平仓...")
-            results['demo'] = self.demo_trader.close_all_positions(symbol, side)
-        
-        if self.live_trader and (self.mode == self.MODE_LIVE_ONLY or self.mode == self.MODE_BOTH):
-            self.logger.info("💰 实盘平仓...")
-            results['live'] = self.live_trader.close_all_positions(symbol, side)
-        
-        return results
-
+        self.logger.info("📤 平仓...")
+        return self._dispatch(lambda trader: trader.close_all_positions(symbol, side))
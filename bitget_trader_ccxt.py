@@ -2,11 +2,180 @@
 Bitget 交易器 - 使用 CCXT 库实现
 支持 U 本位合约交易，包括开仓、平仓、止盈止损等功能
 """
+import json
 import logging
+import os
+import random
+import threading
+import time
 import ccxt
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Any
 
 
+# 交易日志分隔线
+_SEP = "=" * 60
+
+
+# 市场信息磁盘缓存（模拟盘与实盘的合约市场相同，共用一份），过期后重新从交易所下载
+MARKETS_CACHE_FILE = os.path.join('.cache', 'bitget_markets.json')
+MARKETS_CACHE_TTL = 3600
+
+
+# 持仓查询结果的缓存有效期（秒），下单后立即失效
+POSITION_CACHE_TTL = 0.3
+
+
+def create_http_session(pool_size: int = 20) -> requests.Session:
+    """
+    创建交易所请求使用的 HTTP 会话
+    
+    连接池需覆盖并发下单（多个交易对 + 止盈止损）的连接数，
+    否则超出部分的连接用完即弃，后续请求需要重新建立 TCP/TLS 连接。
+    
+    Args:
+        pool_size: 每个主机保持的最大连接数
+        
+    Returns:
+        requests.Session 实例
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _parse_price(value: Any) -> Optional[float]:
+    """
+    解析止盈/止损价格
+    
+    Args:
+        value: 原始价格（数字或字符串，'N/A' 表示未设置）
+        
+    Returns:
+        价格，未设置或无法解析时返回 None
+    """
+    if not value or value == 'N/A':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    
+    连续失败达到阈值后打开，打开期间请求直接失败而不访问交易所；
+    冷却时间过后进入半开状态，只放行少量探测请求，探测成功则关闭，失败则重新打开。
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_probes: int = 1, failure_exceptions: tuple = (Exception,),
+                 name: str = ''):
+        """
+        初始化熔断器
+        
+        Args:
+            failure_threshold: 连续失败多少次后打开
+            reset_timeout: 打开后多少秒进入半开状态
+            half_open_probes: 半开状态下允许同时进行的探测请求数
+            failure_exceptions: 计为失败的异常类型，其他异常说明对端可用，不计入失败
+            name: 名称（用于日志显示）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.failure_exceptions = failure_exceptions
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+        
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+    
+    def _current_state(self) -> str:
+        """获取当前状态（调用方需持有锁）"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+    
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        with self._lock:
+            return self._current_state()
+    
+    def is_open(self) -> bool:
+        """是否处于打开状态（请求会被直接拒绝）"""
+        return self.state == self.OPEN
+    
+    def execute(self, fn, *args, **kwargs):
+        """
+        通过熔断器调用函数
+        
+        Returns:
+            fn 的返回值
+            
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态下探测名额已满
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                raise CircuitOpenError(f"[{self.name}] 熔断器已打开，暂停请求交易所")
+            if state == self.HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    raise CircuitOpenError(f"[{self.name}] 熔断器半开，正在探测交易所状态")
+                self._probes += 1
+        
+        try:
+            result = fn(*args, **kwargs)
+        except self.failure_exceptions:
+            self._record_failure()
+            raise
+        except Exception:
+            self._record_success()
+            raise
+        
+        self._record_success()
+        return result
+    
+    def _record_success(self):
+        """记录一次成功调用"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                self.logger.info(f"✅ [{self.name}] 交易所恢复，熔断器关闭")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+    
+    def _record_failure(self):
+        """记录一次失败调用"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.logger.error(f"⛔ [{self.name}] 交易所连续失败 {self._failures} 次，熔断器打开 {self.reset_timeout:.0f} 秒")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
 class BitgetTraderCCXT:
     """
     Bitget 交易器（基于 CCXT）
@@ -19,8 +188,33 @@ class BitgetTraderCCXT:
     - 支持模拟盘/实盘切换
     """
     
+    # 批量执行时最多同时处理的交易对数量（兼顾延迟与交易所限频）
+    MAX_CONCURRENT_TRADES = 8
+    
+    # 单次批量下单的最大订单数
+    BATCH_ORDER_LIMIT = 20
+    
+    # 查询类请求可重试的瞬时错误（超时、限频、交易所不可用等）
+    RETRYABLE_ERRORS = (ccxt.NetworkError,)
+    # 下单请求只重试限频类错误（请求被拒绝、未被处理）：超时或网关 5xx（ExchangeNotAvailable）时
+    # 订单可能已被受理，重试会重复下单
+    ORDER_RETRYABLE_ERRORS = (ccxt.RateLimitExceeded, ccxt.DDoSProtection)
+    
+    # 操作类型 -> (操作, 方向)
+    _ACTION_TABLE = {
+        '开多': ('open', 'long'), '开空': ('open', 'short'),
+        '平多': ('close', 'long'), '平空': ('close', 'short'),
+        '加多': ('add', 'long'), '加空': ('add', 'short'),
+        '减多': ('reduce', 'long'), '减空': ('reduce', 'short'),
+        # TradeAnalyzer 生成的加减仓操作
+        '加仓买多': ('add', 'long'), '加仓卖空': ('add', 'short'),
+        '减仓买多': ('reduce', 'long'), '减仓卖空': ('reduce', 'short'),
+    }
+    
     def __init__(self, api_key: str, secret_key: str, passphrase: str, 
-                 scale_ratio: float = 1.0, env_name: str = '交易'):
+                 scale_ratio: float = 1.0, env_name: str = '交易',
+                 markets: Optional[Dict] = None, session: Optional[requests.Session] = None,
+                 markets_cache: Optional[str] = None):
         """
         初始化 Bitget 交易器
         
@@ -30,17 +224,41 @@ class BitgetTraderCCXT:
             passphrase: Passphrase
             scale_ratio: 交易量缩放比例（默认 1.0 = 100%）
             env_name: 环境名称（用于日志显示，如"实盘"、"模拟盘"）
+            markets: 已加载的市场信息（可选，提供时不再从交易所下载）
+            session: HTTP 会话（可选，多个交易器可共享同一连接池）
+            markets_cache: 市场信息磁盘缓存文件（可选，未过期时不再从交易所下载）
         """
         self.logger = logging.getLogger(__name__)
         self.scale_ratio = scale_ratio
         self.env_name = env_name
         
+        # 交易所连续出错时熔断，避免在故障期间逐笔等待超时
+        self._breaker = CircuitBreaker(
+            failure_threshold=5,
+            reset_timeout=30.0,
+            half_open_probes=1,
+            failure_exceptions=(ccxt.NetworkError,),
+            name=env_name
+        )
+        
+        # 持仓缓存（按实例，即按账户）：交易对 -> (查询时间, 持仓列表)
+        # 交易对 -> 失效次数，查询期间发生失效（如下单）时不写回可能已过期的结果
+        self._position_cache: Dict[str, tuple] = {}
+        self._position_generation: Dict[str, int] = {}
+        self._position_lock = threading.Lock()
+        
+        # 币种 -> CCXT 交易对（如 'BTC' -> 'BTC/USDT:USDT'）
+        self._symbol_cache: Dict[str, str] = {}
+        # 交易对 -> (最小下单量, 数量步长)，从已加载的市场信息中提取
+        self._market_meta: Dict[str, tuple] = {}
+        
         # 初始化 CCXT Bitget 交易所
         self.exchange = ccxt.bitget({
             'apiKey': api_key,
             'secret': secret_key,
             'password': passphrase,
             'enableRateLimit': True,
+            'session': session or create_http_session(),
             'options': {
                 'defaultType': 'swap',  # U 本位合约
                 'defaultSubType': 'linear',  # 正向合约（USDT 本位）
@@ -48,7 +266,8 @@ class BitgetTraderCCXT:
         })
         
         # 如果是模拟盘环境，设置沙盒模式
-        if 'demo' in env_name.lower() or '模拟' in env_name:
+        self.sandbox = 'demo' in env_name.lower() or '模拟' in env_name
+        if self.sandbox:
             self.exchange.set_sandbox_mode(True)
             self.logger.info("🔸 已启用沙盒模式（模拟盘环境）")
         
@@ -59,7 +278,12 @@ class BitgetTraderCCXT:
         # 自动设置为单向持仓模式
         try:
             # 先加载市场信息（某些 API 调用需要）
-            self.exchange.load_markets()
+            if markets:
+                self.exchange.set_markets(markets)
+            elif markets_cache:
+                self.load_markets_cached(markets_cache)
+            else:
+                self.exchange.load_markets()
             # 设置持仓模式为单向持仓 (hedged=False)
             self.exchange.set_position_mode(hedged=False)
             self.logger.info("🔧 已自动设置为单向持仓模式")
@@ -84,6 +308,131 @@ class BitgetTraderCCXT:
             self.logger.error(f"❌ 加载市场信息失败: {e}")
             raise
     
+    def load_markets_cached(self, path: str = MARKETS_CACHE_FILE, ttl: float = MARKETS_CACHE_TTL):
+        """
+        从磁盘缓存加载市场信息，缓存不存在或已过期时从交易所下载并写回缓存
+        
+        沙盒（模拟盘）交易器使用单独的缓存文件（如 bitget_markets.demo.json），不与实盘共用
+        
+        Args:
+            path: 缓存文件路径（实盘）
+            ttl: 缓存有效期（秒）
+        """
+        if self.sandbox:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.demo{ext}"
+        
+        try:
+            if time.time() - os.stat(path).st_mtime < ttl:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.exchange.set_markets(json.load(f))
+                self.logger.info(f"✅ 已从缓存加载市场信息: {path}")
+                return
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️  读取市场信息缓存失败，重新下载: {e}")
+        
+        markets = self.exchange.load_markets()
+        
+        # 先写临时文件再替换，避免并发运行时读到写了一半的缓存
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(markets, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"⚠️  写入市场信息缓存失败: {e}")
+    
+    def _retry(self, fn, *args, retry_on: tuple = RETRYABLE_ERRORS, attempts: int = 3,
+               base: float = 1.0, cap: float = 30.0, jitter: float = 0.5, **kwargs):
+        """
+        调用交易所接口，遇到瞬时错误时按指数退避加随机抖动重试
+        
+        认证失败、参数错误等非瞬时错误不重试，直接抛出。
+        
+        Args:
+            fn: 要调用的交易所方法
+            retry_on: 需要重试的异常类型
+            attempts: 最大尝试次数
+            base: 首次重试等待秒数
+            cap: 单次等待上限（秒）
+            jitter: 等待时间随机抖动比例
+            
+        Returns:
+            fn 的返回值
+        """
+        for attempt in range(attempts):
+            try:
+                return fn(*args, **kwargs)
+            except retry_on as e:
+                if attempt == attempts - 1:
+                    raise
+                
+                delay = min(cap, base * 2 ** attempt) * (1 + random.uniform(-jitter, jitter))
+                retry_after = self._get_retry_after()
+                if retry_after:
+                    delay = min(cap, max(delay, retry_after))
+                
+                self.logger.warning(f"⚠️ [{self.env_name}] 请求失败: {e}，{delay:.1f} 秒后重试 ({attempt + 1}/{attempts - 1})")
+                time.sleep(delay)
+    
+    def _request(self, fn, *args, retry_on: tuple = RETRYABLE_ERRORS, **kwargs):
+        """
+        请求交易所接口（经过熔断器，并对瞬时错误重试）
+        
+        Args:
+            fn: 要调用的交易所方法
+            retry_on: 需要重试的异常类型
+            
+        Returns:
+            fn 的返回值
+            
+        Raises:
+            CircuitOpenError: 熔断器打开时直接抛出，不访问交易所
+        """
+        return self._breaker.execute(self._retry, fn, *args, retry_on=retry_on, **kwargs)
+    
+    def _get_retry_after(self) -> Optional[float]:
+        """读取最近一次响应的 Retry-After 头（秒），不存在或无法解析时返回 None"""
+        headers = getattr(self.exchange, 'last_response_headers', None) or {}
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        try:
+            return float(value) if value else None
+        except (TypeError, ValueError):
+            return None
+    
+    def _get_symbol(self, symbol_base: str) -> str:
+        """获取币种对应的 CCXT U 本位合约交易对"""
+        symbol = self._symbol_cache.get(symbol_base)
+        if symbol is None:
+            symbol = self._symbol_cache.setdefault(symbol_base, f"{symbol_base}/USDT:USDT")
+        return symbol
+    
+    def _get_market_meta(self, symbol: str) -> Optional[tuple]:
+        """
+        获取交易对的下单限制
+        
+        Args:
+            symbol: 交易对，如 'BTC/USDT:USDT'
+            
+        Returns:
+            (最小下单量, 数量步长)，市场信息未加载或交易对不存在时返回 None
+        """
+        meta = self._market_meta.get(symbol)
+        if meta is None:
+            market = (self.exchange.markets or {}).get(symbol)
+            if not market:
+                return None
+            min_amount = ((market.get('limits') or {}).get('amount') or {}).get('min')
+            amount_precision = (market.get('precision') or {}).get('amount')
+            if self.exchange.precisionMode != ccxt.TICK_SIZE:
+                # 非步长模式下精度表示小数位数，无法直接作为最小下单量比较
+                amount_precision = None
+            meta = self._market_meta.setdefault(symbol, (min_amount, amount_precision))
+        return meta
+    
     def test_connection(self) -> bool:
         """
         测试连接
@@ -93,7 +442,7 @@ class BitgetTraderCCXT:
         """
         try:
             # 获取账户余额来测试连接
-            balance = self.exchange.fetch_balance()
+            balance = self._request(self.exchange.fetch_balance)
             self.logger.info(f"✅ [{self.env_name}] 连接测试成功")
             
             # 显示余额信息
@@ -106,6 +455,41 @@ class BitgetTraderCCXT:
             self.logger.error(f"❌ [{self.env_name}] 连接测试失败: {e}")
             return False
     
+    def _build_order_params(self, side: str, params: Optional[Dict] = None) -> Dict:
+        """
+        构建下单参数（补充 holdSide）
+        
+        Args:
+            side: 方向，'buy' 或 'sell'
+            params: 额外参数，如 {'reduceOnly': True}
+            
+        Returns:
+            下单参数字典
+        """
+        # 合并参数
+        order_params = params or {}
+        
+        # 判断是开仓还是平仓
+        is_reduce_only = order_params.get('reduceOnly', False)
+        
+        # Bitget 单向持仓模式：只设置 holdSide，不设置 tradeSide
+        # tradeSide 可能与某些设置冲突，让 Bitget 根据 holdSide 和 reduceOnly 自动判断
+        if 'holdSide' not in order_params:
+            if is_reduce_only:
+                # 平仓：holdSide 表示要平的仓位方向
+                if side == 'sell':
+                    order_params['holdSide'] = 'long'   # 卖出平多仓
+                elif side == 'buy':
+                    order_params['holdSide'] = 'short'  # 买入平空仓
+            else:
+                # 开仓：holdSide 表示要开的仓位方向
+                if side == 'buy':
+                    order_params['holdSide'] = 'long'
+                elif side == 'sell':
+                    order_params['holdSide'] = 'short'
+        
+        return order_params
+    
     def place_order(self, symbol: str, side: str, order_type: str, amount: float,
                    price: Optional[float] = None, params: Optional[Dict] = None) -> Optional[Dict]:
         """
@@ -119,31 +503,28 @@ class BitgetTraderCCXT:
             price: 价格（限价单需要）
             params: 额外参数，如 {'reduceOnly': True}
             
+        Returns:
+            订单信息，失败或熔断期间跳过返回 None
+        """
+        try:
+            return self._place_order(symbol, side, order_type, amount, price, params)
+        except CircuitOpenError as e:
+            self.logger.warning(f"⏭️ [{self.env_name}] 熔断中，跳过下单: {e}")
+            return None
+    
+    def _place_order(self, symbol: str, side: str, order_type: str, amount: float,
+                     price: Optional[float] = None, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        下单（参数同 place_order）
+        
         Returns:
             订单信息，失败返回 None
+            
+        Raises:
+            CircuitOpenError: 熔断器打开，订单未提交到交易所（调用方按跳过处理）
         """
         try:
-            # 合并参数
-            order_params = params or {}
-            
-            # 判断是开仓还是平仓
-            is_reduce_only = order_params.get('reduceOnly', False)
-            
-            # Bitget 单向持仓模式：只设置 holdSide，不设置 tradeSide
-            # tradeSide 可能与某些设置冲突，让 Bitget 根据 holdSide 和 reduceOnly 自动判断
-            if 'holdSide' not in order_params:
-                if is_reduce_only:
-                    # 平仓：holdSide 表示要平的仓位方向
-                    if side == 'sell':
-                        order_params['holdSide'] = 'long'   # 卖出平多仓
-                    elif side == 'buy':
-                        order_params['holdSide'] = 'short'  # 买入平空仓
-                else:
-                    # 开仓：holdSide 表示要开的仓位方向
-                    if side == 'buy':
-                        order_params['holdSide'] = 'long'
-                    elif side == 'sell':
-                        order_params['holdSide'] = 'short'
+            order_params = self._build_order_params(side, params)
             
             self.logger.info(f"准备下单: {symbol} {side} {order_type} {amount}")
             self.logger.info(f"下单参数: side={side}, holdSide={order_params.get('holdSide')}, "
@@ -153,7 +534,9 @@ class BitgetTraderCCXT:
             
             # 下单
             if order_type == 'market':
-                order = self.exchange.create_order(
+                order = self._request(
+                    self.exchange.create_order,
+                    retry_on=self.ORDER_RETRYABLE_ERRORS,
                     symbol=symbol,
                     type='market',
                     side=side,
@@ -161,7 +544,9 @@ class BitgetTraderCCXT:
                     params=order_params
                 )
             else:
-                order = self.exchange.create_order(
+                order = self._request(
+                    self.exchange.create_order,
+                    retry_on=self.ORDER_RETRYABLE_ERRORS,
                     symbol=symbol,
                     type='limit',
                     side=side,
@@ -173,15 +558,18 @@ class BitgetTraderCCXT:
             self.logger.info(f"✅ [{self.env_name}] 下单成功，订单ID: {order.get('id')}")
             return order
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            self.logger.error(f"❌ [{self.env_name}] 下单失败: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"❌ [{self.env_name}] 下单失败: {e}")
             return None
+        finally:
+            # 下单（包括超时等结果未知的情况）后持仓可能已变化
+            self._invalidate_positions(symbol)
     
     def get_position(self, symbol: str) -> List[Dict]:
         """
-        查询持仓
+        查询持仓（短时间内重复查询同一交易对时复用上次结果）
         
         Args:
             symbol: 交易对，如 'BTC/USDT:USDT'
@@ -189,15 +577,29 @@ class BitgetTraderCCXT:
         Returns:
             持仓列表
         """
+        cached = self._position_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < POSITION_CACHE_TTL:
+            return list(cached[1])
+        
+        generation = self._position_generation.get(symbol, 0)
         try:
-            positions = self.exchange.fetch_positions([symbol])
+            positions = self._request(self.exchange.fetch_positions, [symbol])
             # 过滤出有持仓的
             active_positions = [p for p in positions if float(p.get('contracts', 0)) > 0]
-            return active_positions
+            with self._position_lock:
+                if self._position_generation.get(symbol, 0) == generation:
+                    self._position_cache[symbol] = (time.monotonic(), active_positions)
+            return list(active_positions)
         except Exception as e:
             self.logger.error(f"❌ [{self.env_name}] 查询持仓失败: {e}")
             return []
     
+    def _invalidate_positions(self, symbol: str):
+        """使指定交易对的持仓缓存失效（持仓可能已发生变化）"""
+        with self._position_lock:
+            self._position_generation[symbol] = self._position_generation.get(symbol, 0) + 1
+            self._position_cache.pop(symbol, None)
+    
     def set_take_profit_stop_loss(self, symbol: str, side: str, amount: float,
                                   take_profit_price: Optional[float] = None,
                                   stop_loss_price: Optional[float] = None) -> Dict[str, Any]:
@@ -214,53 +616,66 @@ class BitgetTraderCCXT:
         Returns:
             结果字典 {'take_profit': order, 'stop_loss': order}
         """
-        result = {}
+        # 止盈和止损是两个独立的计划委托，同时提交以缩短开仓后无止损保护的时间
+        trigger_prices = {}
+        if take_profit_price:
+            trigger_prices['take_profit'] = take_profit_price
+        if stop_loss_price:
+            trigger_prices['stop_loss'] = stop_loss_price
         
-        # 确定持仓方向（平仓时，side和持仓方向相反）
-        # side='sell' 表示平多仓，hold/positionSide='long'
-        # side='buy' 表示平空仓，hold/positionSide='short'
-        position_side = 'long' if side == 'sell' else 'short'
+        if len(trigger_prices) > 1:
+            with ThreadPoolExecutor(max_workers=len(trigger_prices), thread_name_prefix='bitget-tpsl') as pool:
+                futures = {
+                    kind: pool.submit(self._place_trigger_order, kind, symbol, side, amount, price)
+                    for kind, price in trigger_prices.items()
+                }
+                orders = {kind: future.result() for kind, future in futures.items()}
+        else:
+            orders = {
+                kind: self._place_trigger_order(kind, symbol, side, amount, price)
+                for kind, price in trigger_prices.items()
+            }
         
-        # Bitget 止盈止损订单是计划委托，参数设置不同
-        # 止盈订单：triggerType='fill_price' 表示按标记价格触发
-        if take_profit_price:
-            try:
-                tp_order = self.exchange.create_order(
-                    symbol=symbol,
-                    type='market',
-                    side=side,
-                    amount=amount,
-                    params={
-                        'triggerPrice': take_profit_price,  # 触发价格
-                        'triggerType': 'fill_price',  # 按标记价格触发
-                        'reduceOnly': True
-                    }
-                )
-                result['take_profit'] = tp_order
-                self.logger.info(f"✅ [{self.env_name}] 止盈订单设置成功: {take_profit_price}")
-            except Exception as e:
-                self.logger.error(f"❌ [{self.env_name}] 止盈订单失败: {e}")
+        return {kind: order for kind, order in orders.items() if order}
+    
+    def _place_trigger_order(self, kind: str, symbol: str, side: str, amount: float,
+                             trigger_price: float) -> Optional[Dict]:
+        """
+        下止盈或止损计划委托
         
-        # 止损订单：triggerType='fill_price' 表示按标记价格触发
-        if stop_loss_price:
-            try:
-                sl_order = self.exchange.create_order(
-                    symbol=symbol,
-                    type='market',
-                    side=side,
-                    amount=amount,
-                    params={
-                        'triggerPrice': stop_loss_price,  # 触发价格
-                        'triggerType': 'fill_price',  # 按标记价格触发
-                        'reduceOnly': True
-                    }
-                )
-                result['stop_loss'] = sl_order
-                self.logger.info(f"✅ [{self.env_name}] 止损订单设置成功: {stop_loss_price}")
-            except Exception as e:
-                self.logger.error(f"❌ [{self.env_name}] 止损订单失败: {e}")
+        Args:
+            kind: 'take_profit' 或 'stop_loss'
+            symbol: 交易对
+            side: 平仓方向（平多用 'sell'，平空用 'buy'）
+            amount: 数量
+            trigger_price: 触发价格
+            
+        Returns:
+            订单信息，失败返回 None
+        """
+        label = '止盈' if kind == 'take_profit' else '止损'
         
-        return result
+        # Bitget 止盈止损订单是计划委托，参数设置不同
+        # triggerType='fill_price' 表示按标记价格触发
+        try:
+            order = self._request(
+                self.exchange.create_order,
+                retry_on=self.ORDER_RETRYABLE_ERRORS,
+                symbol=symbol,
+                type='market',
+                side=side,
+                amount=amount,
+                params={
+                    'triggerPrice': trigger_price,  # 触发价格
+                    'triggerType': 'fill_price',  # 按标记价格触发
+                    'reduceOnly': True
+                }
+            )
+            self.logger.info(f"✅ [{self.env_name}] {label}订单设置成功: {trigger_price}")
+            return order
+        except Exception as e:
+            self.logger.error(f"❌ [{self.env_name}] {label}订单失败: {e}")
+            return None
     
     def close_all_positions(self, symbol: str, side: Optional[str] = None) -> bool:
         """
@@ -313,11 +728,69 @@ class BitgetTraderCCXT:
         except Exception as e:
             self.logger.error(f"❌ [{self.env_name}] 平仓过程出错: {e}")
             return False
+        finally:
+            self._invalidate_positions(symbol)
+    
+    def place_orders_batch(self, symbol: str, orders: List[Dict]) -> List[Optional[bool]]:
+        """
+        批量下市价单（同一交易对，使用 Bitget 批量下单接口）
+        
+        Args:
+            symbol: 交易对，如 'BTC/USDT:USDT'
+            orders: 订单列表，每个订单包含 side、amount、params（可选）
+            
+        Returns:
+            每个订单是否成功的列表（只保证成功数量正确，不保证与输入顺序一一对应），
+            熔断期间未提交的订单为 None
+        """
+        results = []
+        
+        for start in range(0, len(orders), self.BATCH_ORDER_LIMIT):
+            chunk = orders[start:start + self.BATCH_ORDER_LIMIT]
+            order_requests = [{
+                'symbol': symbol,
+                'type': 'market',
+                'side': order['side'],
+                'amount': order['amount'],
+                'params': self._build_order_params(order['side'], order.get('params')),
+            } for order in chunk]
+            
+            try:
+                self.logger.info(f"准备批量下单: {symbol} 共 {len(order_requests)} 笔")
+                placed = self._request(
+                    self.exchange.create_orders,
+                    order_requests,
+                    retry_on=self.ORDER_RETRYABLE_ERRORS
+                )
+                statuses = [order.get('status') != 'rejected' for order in placed]
+                # 交易所未返回的订单视为失败
+                statuses += [False] * (len(chunk) - len(statuses))
+                
+                succeeded = sum(statuses)
+                if succeeded == len(chunk):
+                    self.logger.info(f"✅ [{self.env_name}] 批量下单成功: {succeeded}/{len(chunk)}")
+                else:
+                    self.logger.error(f"❌ [{self.env_name}] 批量下单部分失败: 成功 {succeeded}/{len(chunk)}")
+                results.extend(statuses)
+            except CircuitOpenError as e:
+                self.logger.warning(f"⏭️ [{self.env_name}] 熔断中，跳过批量下单 {len(chunk)} 笔: {e}")
+                results.extend([None] * len(chunk))
+            except Exception as e:
+                self.logger.error(f"❌ [{self.env_name}] 批量下单失败: {e}")
+                results.extend([False] * len(chunk))
+            finally:
+                self._invalidate_positions(symbol)
+        
+        return results
     
     def execute_trades(self, trades: List[Dict], dry_run: bool = False) -> Dict[str, int]:
         """
         批量执行交易
         
+        同一交易对的交易按原顺序串行执行，不同交易对之间并发执行，
+        总耗时约为最慢交易对的耗时，而不是所有交易耗时之和。
+        同一交易对上连续的平仓/加仓/减仓会合并为一次批量下单请求。
+        
         Args:
             trades: 交易列表，每个交易包含:
                 - symbol: 币种符号（如 'BTC'）
@@ -329,158 +802,296 @@ class BitgetTraderCCXT:
             dry_run: 是否模拟运行（True=只打印不下单）
             
         Returns:
-            执行结果 {'success': 成功数, 'failed': 失败数}
+            执行结果 {'success': 成功数, 'failed': 失败数, 'skipped': 熔断期间跳过数}
         """
-        success_count = 0
-        failed_count = 0
+        total = len(trades)
         
+        # 按交易对分组，保证同一交易对上的开/加/减/平顺序不变
+        groups: Dict[str, List] = {}
         for i, trade in enumerate(trades, 1):
-            try:
-                symbol_base = trade.get('symbol', '').upper()
-                action = trade.get('action', '')
-                quantity = float(trade.get('quantity', 0))
-                direction = trade.get('direction', 'long')
-                tp = trade.get('profit_target')
-                sl = trade.get('stop_loss')
-                
-                # 构建 CCXT 格式的交易对
-                symbol = f"{symbol_base}/USDT:USDT"
-                
-                # 缩放数量
-                scaled_quantity = quantity * self.scale_ratio
-                
-                self.logger.info("")
-                self.logger.info(f"{'=' * 60}")
-                self.logger.info(f"[{self.env_name}] 交易 {i}/{len(trades)}: {symbol_base} {action}")
-                self.logger.info(f"{'=' * 60}")
-                self.logger.info(f"原始数量: {quantity}")
-                self.logger.info(f"缩放后数量: {scaled_quantity} (比例: {self.scale_ratio})")
-                self.logger.info(f"方向: {direction}")
-                self.logger.info(f"止盈: {tp}")
-                self.logger.info(f"止损: {sl}")
-                
-                # 检查数量是否有效
-                if quantity <= 0 or scaled_quantity <= 0:
-                    self.logger.warning(f"⚠️ [{self.env_name}] 跳过：数量为 0 或负数")
-                    success_count += 1  # 算作成功，因为这不是错误
+            groups.setdefault(str(trade.get('symbol', '')).upper(), []).append((i, trade))
+        
+        def run_group(group: List) -> List[Optional[bool]]:
+            outcomes = []
+            pending = []  # 等待合并下单的平仓/加仓/减仓订单
+            
+            for i, trade in group:
+                prepared = self._prepare_trade(trade, i, total, dry_run)
+                if isinstance(prepared, bool):
+                    outcomes.append(prepared)
                     continue
                 
-                # 检查缩放后的数量是否太小（低于交易所最小精度）
-                # 大多数交易所要求至少 0.0001 或更大的数量
-                if scaled_quantity < 0.0001:
-                    self.logger.warning(f"⚠️ [{self.env_name}] 跳过：缩放后数量太小 ({scaled_quantity})，建议增加缩放比例")
-                    success_count += 1
+                if self._breaker.is_open():
+                    # 交易所故障期间不下单，跳过的交易不计为失败
+                    self.logger.warning(f"⏭️ [{self.env_name}] 熔断器已打开，跳过交易 {i}/{total}: {prepared['symbol']}")
+                    outcomes.append(None)
                     continue
                 
-                if dry_run:
-                    self.logger.info("🔸 [模拟模式] 跳过实际下单")
-                    success_count += 1
+                if not prepared['open']:
+                    pending.append(prepared)
                     continue
                 
-                # 判断操作类型
-                is_open = '开' in action  # 开仓
-                is_close = '平' in action  # 平仓
-                is_add = '加' in action   # 加仓
-                is_reduce = '减' in action  # 减仓
-                
-                is_long = direction == 'long' or '多' in action
-                is_short = direction == 'short' or '空' in action
-                
-                # 执行操作
-                if is_close:
-                    # 平仓
-                    close_side = 'sell' if is_long else 'buy'
-                    order = self.place_order(
-                        symbol=symbol,
-                        side=close_side,
-                        order_type='market',
-                        amount=scaled_quantity,
-                        params={'reduceOnly': True}
-                    )
-                    if order:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                
-                elif is_open:
-                    # 开仓
-                    open_side = 'buy' if is_long else 'sell'
-                    
-                    # 验证止盈止损
-                    if not tp or tp == 'N/A' or not sl or sl == 'N/A':
-                        self.logger.error(f"⛔ [{self.env_name}] 拒绝开仓 {symbol}: 缺少止盈或止损！")
-                        self.logger.error(f"⛔ 风险控制：不允许没有止盈止损的仓位存在！")
-                        failed_count += 1
-                        continue
-                    
-                    # 开仓
-                    order = self.place_order(
-                        symbol=symbol,
-                        side=open_side,
-                        order_type='market',
-                        amount=scaled_quantity
-                    )
-                    
-                    if order:
-                        # 设置止盈止损
-                        tp_price = float(tp) if tp and tp != 'N/A' else None
-                        sl_price = float(sl) if sl and sl != 'N/A' else None
-                        
-                        close_side = 'sell' if is_long else 'buy'
-                        tp_sl_result = self.set_take_profit_stop_loss(
-                            symbol=symbol,
-                            side=close_side,
-                            amount=scaled_quantity,
-                            take_profit_price=tp_price,
-                            stop_loss_price=sl_price
-                        )
-                        
-                        if tp_sl_result.get('stop_loss'):
-                            success_count += 1
-                        else:
-                            self.logger.error(f"❌ [{self.env_name}] 止损设置失败！")
-                            failed_count += 1
-                    else:
-                        failed_count += 1
-                
-                elif is_add or is_reduce:
-                    # 加仓或减仓
-                    if is_add:
-                        # 加仓 = 买入（多）或卖出（空）
-                        order_side = 'buy' if is_long else 'sell'
-                        order = self.place_order(
-                            symbol=symbol,
-                            side=order_side,
-                            order_type='market',
-                            amount=scaled_quantity
-                        )
-                    else:
-                        # 减仓 = 卖出（多）或买入（空）
-                        order_side = 'sell' if is_long else 'buy'
-                        order = self.place_order(
-                            symbol=symbol,
-                            side=order_side,
-                            order_type='market',
-                            amount=scaled_quantity,
-                            params={'reduceOnly': True}
-                        )
-                    
-                    if order:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                
+                # 开仓需要在之前的订单完成后执行，并紧接着设置止盈止损
+                outcomes.extend(self._flush_orders(pending))
+                pending = []
+                outcomes.append(self._open_position(prepared))
+            
+            outcomes.extend(self._flush_orders(pending))
+            return outcomes
+        
+        if len(groups) > 1:
+            max_workers = min(self.MAX_CONCURRENT_TRADES, len(groups))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bitget-trade') as pool:
+                group_results = list(pool.map(run_group, groups.values()))
+        else:
+            group_results = [run_group(group) for group in groups.values()]
+        
+        success_count = 0
+        failed_count = 0
+        skipped_count = 0
+        for outcomes in group_results:
+            for ok in outcomes:
+                if ok is None:
+                    skipped_count += 1
+                elif ok:
+                    success_count += 1
                 else:
-                    self.logger.warning(f"⚠️ [{self.env_name}] 未识别的操作类型: {action}")
                     failed_count += 1
-                
-            except Exception as e:
-                self.logger.error(f"❌ [{self.env_name}] 执行交易失败: {e}")
-                import traceback
-                traceback.print_exc()
-                failed_count += 1
+        
+        if skipped_count:
+            self.logger.warning(f"⚠️ [{self.env_name}] 熔断期间跳过 {skipped_count} 个交易")
         
         return {
             'success': success_count,
-            'failed': failed_count
+            'failed': failed_count,
+            'skipped': skipped_count
         }
+    
+    def _prepare_trade(self, trade: Dict, index: int, total: int, dry_run: bool) -> Any:
+        """
+        解析单个交易，生成下单请求
+        
+        Args:
+            trade: 交易信息（格式同 execute_trades）
+            index: 交易序号（从 1 开始，用于日志）
+            total: 交易总数（用于日志）
+            dry_run: 是否模拟运行
+            
+        Returns:
+            无需下单时直接返回结果（True=成功/跳过，False=失败），
+            否则返回下单请求 {'symbol', 'side', 'amount', 'params', 'open', ...}
+        """
+        try:
+            symbol_base = trade.get('symbol', '').upper()
+            action = trade.get('action', '')
+            quantity = float(trade.get('quantity', 0))
+            direction = trade.get('direction', 'long')
+            tp_price = _parse_price(trade.get('profit_target'))
+            sl_price = _parse_price(trade.get('stop_loss'))
+            
+            # 构建 CCXT 格式的交易对
+            symbol = self._get_symbol(symbol_base)
+            
+            # 缩放数量
+            scaled_quantity = quantity * self.scale_ratio
+            
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("")
+                self.logger.info(_SEP)
+                self.logger.info("[%s] 交易 %s/%s: %s %s", self.env_name, index, total, symbol_base, action)
+                self.logger.info(_SEP)
+                self.logger.info("原始数量: %s", quantity)
+                self.logger.info("缩放后数量: %s (比例: %s)", scaled_quantity, self.scale_ratio)
+                self.logger.info("方向: %s", direction)
+                self.logger.info("止盈: %s", tp_price)
+                self.logger.info("止损: %s", sl_price)
+            
+            # 检查数量是否有效
+            if quantity <= 0 or scaled_quantity <= 0:
+                self.logger.warning(f"⚠️ [{self.env_name}] 跳过：数量为 0 或负数")
+                return True  # 算作成功，因为这不是错误
+            
+            # 检查缩放后的数量是否太小（低于交易所最小精度）
+            # 大多数交易所要求至少 0.0001 或更大的数量
+            if scaled_quantity < 0.0001:
+                self.logger.warning(f"⚠️ [{self.env_name}] 跳过：缩放后数量太小 ({scaled_quantity})，建议增加缩放比例")
+                return True
+            
+            # 按交易所的最小下单量和数量精度在本地预检，避免必然失败的下单请求
+            meta = self._get_market_meta(symbol)
+            if meta:
+                min_amount = max(meta[0] or 0, meta[1] or 0)
+                if scaled_quantity < min_amount:
+                    self.logger.warning(f"⚠️ [{self.env_name}] 跳过：缩放后数量 {scaled_quantity} 低于 {symbol} 最小下单量 {min_amount}，建议增加缩放比例")
+                    return True
+            
+            if dry_run:
+                self.logger.info("🔸 [模拟模式] 跳过实际下单")
+                return True
+            
+            # 判断操作类型
+            op, action_direction = self._parse_action(action)
+            is_long = direction == 'long' or action_direction == 'long'
+            
+            if op == 'close':
+                # 平仓
+                return {
+                    'symbol': symbol,
+                    'side': 'sell' if is_long else 'buy',
+                    'amount': scaled_quantity,
+                    'params': {'reduceOnly': True},
+                    'open': False,
+                }
+            
+            if op == 'open':
+                # 验证止盈止损
+                if tp_price is None or sl_price is None:
+                    self.logger.error(f"⛔ [{self.env_name}] 拒绝开仓 {symbol}: 缺少止盈或止损！")
+                    self.logger.error(f"⛔ 风险控制：不允许没有止盈止损的仓位存在！")
+                    return False
+                
+                return {
+                    'symbol': symbol,
+                    'side': 'buy' if is_long else 'sell',
+                    'amount': scaled_quantity,
+                    'params': None,
+                    'open': True,
+                    'close_side': 'sell' if is_long else 'buy',
+                    'take_profit': tp_price,
+                    'stop_loss': sl_price,
+                }
+            
+            if op == 'add':
+                # 加仓 = 买入（多）或卖出（空）
+                return {
+                    'symbol': symbol,
+                    'side': 'buy' if is_long else 'sell',
+                    'amount': scaled_quantity,
+                    'params': None,
+                    'open': False,
+                }
+            
+            if op == 'reduce':
+                # 减仓 = 卖出（多）或买入（空）
+                return {
+                    'symbol': symbol,
+                    'side': 'sell' if is_long else 'buy',
+                    'amount': scaled_quantity,
+                    'params': {'reduceOnly': True},
+                    'open': False,
+                }
+            
+            self.logger.warning(f"⚠️ [{self.env_name}] 未识别的操作类型: {action}")
+            return False
+            
+        except Exception as e:
+            self.logger.error(f"❌ [{self.env_name}] 执行交易失败: {e!r}")
+            return False
+    
+    @staticmethod
+    def _parse_action(action: str) -> tuple:
+        """
+        解析操作类型
+        
+        Args:
+            action: 操作类型（如 '减多', '加仓买多'）
+            
+        Returns:
+            (操作, 方向)，操作为 'open'/'close'/'add'/'reduce'，无法识别时为 None；
+            方向为 'long'/'short'，无法识别时为 None
+        """
+        parsed = BitgetTraderCCXT._ACTION_TABLE.get(action)
+        if parsed is not None:
+            return parsed
+        
+        # 不在表中的操作类型按关键字识别
+        if '平' in action:
+            op = 'close'
+        elif '开' in action:
+            op = 'open'
+        elif '加' in action:
+            op = 'add'
+        elif '减' in action:
+            op = 'reduce'
+        else:
+            op = None
+        
+        if '多' in action:
+            action_direction = 'long'
+        elif '空' in action:
+            action_direction = 'short'
+        else:
+            action_direction = None
+        
+        return op, action_direction
+    
+    def _flush_orders(self, orders: List[Dict]) -> List[Optional[bool]]:
+        """
+        提交同一交易对上累积的平仓/加仓/减仓订单
+        
+        只有一笔时走普通下单，多笔时合并为一次批量下单请求。
+        
+        Args:
+            orders: _prepare_trade 生成的下单请求列表
+            
+        Returns:
+            每个订单是否成功的列表，熔断期间跳过的订单为 None
+        """
+        if not orders:
+            return []
+        
+        if len(orders) == 1:
+            order = orders[0]
+            try:
+                placed = self._place_order(
+                    symbol=order['symbol'],
+                    side=order['side'],
+                    order_type='market',
+                    amount=order['amount'],
+                    params=order['params']
+                )
+            except CircuitOpenError as e:
+                self.logger.warning(f"⏭️ [{self.env_name}] 熔断中，跳过下单: {e}")
+                return [None]
+            return [bool(placed)]
+        
+        return self.place_orders_batch(orders[0]['symbol'], orders)
+    
+    def _open_position(self, order: Dict) -> Optional[bool]:
+        """
+        开仓并设置止盈止损
+        
+        Args:
+            order: _prepare_trade 生成的开仓请求
+            
+        Returns:
+            开仓且止损设置成功返回 True，熔断期间跳过返回 None，否则返回 False
+        """
+        symbol = order['symbol']
+        try:
+            placed = self._place_order(
+                symbol=symbol,
+                side=order['side'],
+                order_type='market',
+                amount=order['amount']
+            )
+        except CircuitOpenError as e:
+            self.logger.warning(f"⏭️ [{self.env_name}] 熔断中，跳过开仓: {e}")
+            return None
+        
+        if not placed:
+            return False
+        
+        # 设置止盈止损
+        tp_sl_result = self.set_take_profit_stop_loss(
+            symbol=symbol,
+            side=order['close_side'],
+            amount=order['amount'],
+            take_profit_price=order['take_profit'],
+            stop_loss_price=order['stop_loss']
+        )
+        
+        if tp_sl_result.get('stop_loss'):
+            return True
+        self.logger.error(f"❌ [{self.env_name}] 止损设置失败！")
+        return False
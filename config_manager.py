@@ -5,12 +5,26 @@
 import json
 import logging
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson  # 可选依赖，存在时用于更快的 JSON 编解码
+except ImportError:
+    orjson = None
 
 
 class ConfigManager:
     """配置管理器"""
     
+    # 数值字段校验规则: key -> (名称, 上限（含，None 表示无上限）, 超出范围说明)
+    _FLOAT_FIELDS = {
+        'scale_ratio': ('缩放比例', 1.0, '超出范围 (0, 1]'),
+        'max_single_trade_amount': ('单笔交易最大金额', None, '必须大于 0'),
+    }
+    
+    # 布尔字段
+    _BOOL_FIELDS = ('enabled', 'api_credentials_from_env', 'notification_on_trade', 'dry_run')
+    
     def __init__(self, config_file: str = "bitget_config.json"):
         """
         初始化配置管理器
@@ -32,6 +46,12 @@ class ConfigManager:
             "dry_run": False  # 模拟运行模式（不实际下单）
         }
         
+        # 内存缓存（按文件 mtime 失效，save_config 时直接刷新）
+        self._cached_config: Optional[Dict[str, Any]] = None
+        self._cache_mtime: Optional[float] = 0  # None 表示缓存的是文件缺失时的默认配置
+        self._whitelist_set: frozenset = frozenset()
+        self._snapshot: Tuple[Dict[str, Any], frozenset] = ({}, frozenset())  # (配置, 白名单集合)，整体替换
+        
         # 确保配置文件存在
         self._ensure_config_file()
     
@@ -46,29 +66,78 @@ class ConfigManager:
         加载配置
         
         Returns:
-            配置字典
+            配置字典（副本，可安全修改）
+        """
+        return dict(self._get_cached_config())
+    
+    def _get_cached_config(self) -> Dict[str, Any]:
+        """
+        获取缓存的配置，文件 mtime 变化时才重新读取
+        
+        Returns:
+            缓存的配置字典（只读，调用方不应修改）
         """
         try:
-            if not os.path.exists(self.config_file):
+            mtime = os.stat(self.config_file).st_mtime
+        except FileNotFoundError:
+            if self._cached_config is None or self._cache_mtime is not None:
                 self.logger.warning(f"配置文件不存在: {self.config_file}，使用默认配置")
-                return self.default_config.copy()
-            
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+                self._set_cache(self._default_copy(), None)
+            return self._cached_config
+        
+        if self._cached_config is not None and mtime == self._cache_mtime:
+            return self._cached_config
+        
+        try:
+            if orjson is not None:
+                with open(self.config_file, 'rb') as f:
+                    config = orjson.loads(f.read())
+            else:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
             
             # 合并默认配置（确保所有字段都存在）
-            merged_config = self.default_config.copy()
-            merged_config.update(config)
+            merged_config = {**self.default_config, **config}
             
+            self._set_cache(merged_config, mtime)
             self.logger.info(f"配置加载成功: {self.config_file}")
             return merged_config
             
         except json.JSONDecodeError as e:
             self.logger.error(f"配置文件格式错误: {e}，使用默认配置")
-            return self.default_config.copy()
         except Exception as e:
             self.logger.error(f"加载配置时发生错误: {e}，使用默认配置")
-            return self.default_config.copy()
+        
+        # 出错时按本次 mtime 缓存默认配置，文件修改前不再重复读取和报错
+        self._set_cache(self._default_copy(), mtime)
+        return self._cached_config
+    
+    def _default_copy(self) -> Dict[str, Any]:
+        """默认配置的副本（不与 default_config 共享可变字段）"""
+        return {**self.default_config, 'whitelist_models': list(self.default_config['whitelist_models'])}
+    
+    def _set_cache(self, config: Dict[str, Any], mtime: Optional[float]) -> None:
+        """
+        刷新配置缓存及白名单集合
+        
+        Args:
+            config: 合并后的配置
+            mtime: 配置文件修改时间（文件不存在时为 None）
+        """
+        self._cached_config = config
+        self._cache_mtime = mtime
+        self._whitelist_set = frozenset(str(m) for m in config.get('whitelist_models') or [])
+        self._snapshot = (config, self._whitelist_set)
+    
+    def get_snapshot(self) -> Tuple[Dict[str, Any], frozenset]:
+        """
+        获取当前配置快照（只读），用于一次调用内多次读取配置
+        
+        Returns:
+            (缓存的配置字典, 白名单模型集合)，两者来自同一次加载，调用方不应修改
+        """
+        self._get_cached_config()
+        return self._snapshot
     
     def save_config(self, config: Dict[str, Any]) -> bool:
         """
@@ -84,8 +153,14 @@ class ConfigManager:
             # 验证配置
             validated_config = self._validate_config(config)
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(validated_config, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                with open(self.config_file, 'wb') as f:
+                    f.write(orjson.dumps(validated_config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(validated_config, f, ensure_ascii=False, indent=2)
+            
+            self._set_cache(validated_config, os.stat(self.config_file).st_mtime)
             
             self.logger.info(f"配置保存成功: {self.config_file}")
             return True
@@ -130,22 +205,19 @@ class ConfigManager:
         """
         validated = self.default_config.copy()
         
-        # 验证并设置 enabled
-        if 'enabled' in config:
-            validated['enabled'] = bool(config['enabled'])
-        
-        # 验证并设置 scale_ratio
-        if 'scale_ratio' in config:
+        # 验证并设置数值字段（必须 > 0，可选上限）
+        for key, (label, upper, range_desc) in self._FLOAT_FIELDS.items():
+            if key not in config:
+                continue
+            default = self.default_config[key]
             try:
-                ratio = float(config['scale_ratio'])
-                if 0 < ratio <= 1:
-                    validated['scale_ratio'] = ratio
+                value = float(config[key])
+                if value > 0 and (upper is None or value <= upper):
+                    validated[key] = value
                 else:
-                    self.logger.warning(f"缩放比例超出范围 (0, 1]: {ratio}，使用默认值 0.1")
-                    validated['scale_ratio'] = 0.1
+                    self.logger.warning(f"{label}{range_desc}: {value}，使用默认值 {default}")
             except (ValueError, TypeError):
-                self.logger.warning(f"缩放比例格式错误: {config['scale_ratio']}，使用默认值 0.1")
-                validated['scale_ratio'] = 0.1
+                self.logger.warning(f"{label}格式错误: {config[key]}，使用默认值 {default}")
         
         # 验证并设置 whitelist_models
         if 'whitelist_models' in config:
@@ -155,21 +227,8 @@ class ConfigManager:
                 self.logger.warning(f"白名单模型格式错误，应为列表: {config['whitelist_models']}")
                 validated['whitelist_models'] = []
         
-        # 验证并设置 max_single_trade_amount
-        if 'max_single_trade_amount' in config:
-            try:
-                amount = float(config['max_single_trade_amount'])
-                if amount > 0:
-                    validated['max_single_trade_amount'] = amount
-                else:
-                    self.logger.warning(f"单笔交易最大金额必须大于 0: {amount}，使用默认值 1000")
-                    validated['max_single_trade_amount'] = 1000
-            except (ValueError, TypeError):
-                self.logger.warning(f"单笔交易最大金额格式错误: {config['max_single_trade_amount']}，使用默认值 1000")
-                validated['max_single_trade_amount'] = 1000
-        
-        # 验证并设置其他布尔值
-        for key in ['api_credentials_from_env', 'notification_on_trade', 'dry_run']:
+        # 验证并设置布尔值
+        for key in self._BOOL_FIELDS:
             if key in config:
                 validated[key] = bool(config[key])
         
@@ -177,7 +236,7 @@ class ConfigManager:
     
     def get_enabled(self) -> bool:
         """获取是否启用自动跟单"""
-        config = self.load_config()
+        config = self._get_cached_config()
         return config.get('enabled', False)
     
     def set_enabled(self, enabled: bool) -> bool:
@@ -186,7 +245,7 @@ class ConfigManager:
     
     def get_scale_ratio(self) -> float:
         """获取缩放比例"""
-        config = self.load_config()
+        config = self._get_cached_config()
         return config.get('scale_ratio', 0.1)
     
     def set_scale_ratio(self, ratio: float) -> bool:
@@ -195,7 +254,7 @@ class ConfigManager:
     
     def get_whitelist_models(self) -> List[str]:
         """获取白名单模型列表"""
-        config = self.load_config()
+        config = self._get_cached_config()
         return config.get('whitelist_models', [])
     
     def set_whitelist_models(self, models: List[str]) -> bool:
@@ -212,22 +271,24 @@ class ConfigManager:
         Returns:
             如果白名单为空（跟随所有模型）或模型在白名单中，返回 True
         """
-        whitelist = self.get_whitelist_models()
+        # 确保缓存是最新的（文件变化时会重建白名单集合）
+        self._get_cached_config()
+        whitelist_set = self._whitelist_set
         
         # 白名单为空表示跟随所有模型
-        if not whitelist:
+        if not whitelist_set:
             return True
         
-        return model_id in whitelist
+        return model_id in whitelist_set
     
     def get_max_single_trade_amount(self) -> float:
         """获取单笔交易最大金额"""
-        config = self.load_config()
+        config = self._get_cached_config()
         return config.get('max_single_trade_amount', 1000)
     
     def is_dry_run(self) -> bool:
         """获取是否为模拟运行模式"""
-        config = self.load_config()
+        config = self._get_cached_config()
         return config.get('dry_run', False)
 
 
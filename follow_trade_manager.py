@@ -4,9 +4,14 @@
 支持多个交易平台的自动跟单功能
 """
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Protocol
-from datetime import datetime
 from abc import ABC, abstractmethod
+from wechat_notifier import create_notify_session, WECHAT_REQUEST_TIMEOUT
+
+
+_BAR = '=' * 80
 
 
 class TradeExecutor(Protocol):
@@ -62,12 +67,21 @@ class FollowTradeManager:
         # 格式: {'platform_name': {'executor': TradeExecutor, 'enabled': bool}}
         self.platforms: Dict[str, Dict] = {}
         
+        # 已启用平台（由注册/启用状态变更时维护，避免每次跟单都重新筛选）
+        self._enabled_platforms: Dict[str, Dict] = {}
+        
         # 通知器
         self.notifiers = {
             'wechat': None,
             'telegram': None
         }
         
+        # 复用 HTTP 连接（keep-alive），重试策略与监控通知一致
+        self._http = create_notify_session()
+        
+        # 通知发送线程池：各渠道并行发送，且不阻塞跟单流程
+        self._notify_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='notify')
+        
         self.logger.info("跟单管理器初始化完成")
     
     def register_platform(self, platform_name: str, executor: TradeExecutor, 
@@ -80,11 +94,16 @@ class FollowTradeManager:
             executor: 交易执行器实例
             enabled: 是否启用该平台的跟单
         """
-        self.platforms[platform_name] = {
+        info = {
             'executor': executor,
             'enabled': enabled
         }
-        self.logger.info(f"✅ 注册交易平台: {platform_name} (启用: {enabled})")
+        self.platforms[platform_name] = info
+        if enabled:
+            self._enabled_platforms[platform_name] = info
+        else:
+            self._enabled_platforms.pop(platform_name, None)
+        self.logger.info("✅ 注册交易平台: %s (启用: %s)", platform_name, enabled)
     
     def unregister_platform(self, platform_name: str) -> None:
         """
@@ -95,7 +114,8 @@ class FollowTradeManager:
         """
         if platform_name in self.platforms:
             del self.platforms[platform_name]
-            self.logger.info(f"❌ 取消注册交易平台: {platform_name}")
+            self._enabled_platforms.pop(platform_name, None)
+            self.logger.info("❌ 取消注册交易平台: %s", platform_name)
     
     def set_platform_enabled(self, platform_name: str, enabled: bool) -> None:
         """
@@ -106,8 +126,13 @@ class FollowTradeManager:
             enabled: 是否启用
         """
         if platform_name in self.platforms:
-            self.platforms[platform_name]['enabled'] = enabled
-            self.logger.info(f"设置平台 {platform_name} 启用状态: {enabled}")
+            info = self.platforms[platform_name]
+            info['enabled'] = enabled
+            if enabled:
+                self._enabled_platforms[platform_name] = info
+            else:
+                self._enabled_platforms.pop(platform_name, None)
+            self.logger.info("设置平台 %s 启用状态: %s", platform_name, enabled)
     
     def register_notifier(self, notifier_type: str, notifier) -> None:
         """
@@ -119,7 +144,7 @@ class FollowTradeManager:
         """
         if notifier_type in self.notifiers:
             self.notifiers[notifier_type] = notifier
-            self.logger.info(f"✅ 注册通知器: {notifier_type}")
+            self.logger.info("✅ 注册通知器: %s", notifier_type)
     
     def execute_follow_trades(self, trades: List[Dict]) -> Dict[str, Dict]:
         """
@@ -134,29 +159,34 @@ class FollowTradeManager:
         results = {}
         
         try:
-            self.logger.info(f"")
-            self.logger.info(f"{'='*80}")
-            self.logger.info(f"🤖 开始执行跟单流程")
-            self.logger.info(f"   接收到的交易数量: {len(trades)}")
-            self.logger.info(f"{'='*80}")
+            self.logger.info("")
+            self.logger.info("%s", _BAR)
+            self.logger.info("🤖 开始执行跟单流程")
+            self.logger.info("   接收到的交易数量: %s", len(trades))
+            self.logger.info("%s", _BAR)
             
             # 检查是否有启用的平台
-            self.logger.info(f"📋 检查已注册的平台...")
-            self.logger.info(f"   已注册平台: {list(self.platforms.keys())}")
+            info_enabled = self.logger.isEnabledFor(logging.INFO)
+            if info_enabled:
+                self.logger.info("📋 检查已注册的平台...")
+                self.logger.info("   已注册平台: %s", list(self.platforms.keys()))
             
-            enabled_platforms = {name: info for name, info in self.platforms.items() 
-                               if info['enabled']}
+            enabled_platforms = self._enabled_platforms
             
-            self.logger.info(f"   启用的平台: {list(enabled_platforms.keys())}")
+            if info_enabled:
+                self.logger.info("   启用的平台: %s", list(enabled_platforms.keys()))
             
             if not enabled_platforms:
                 self.logger.warning("❌ 没有启用的交易平台，跳过跟单")
                 return results
             
+            # 一次性读取配置快照，避免在流程中反复访问配置管理器
+            cfg, whitelist_set = self.config_manager.get_snapshot() if self.config_manager else ({}, frozenset())
+            
             # 检查是否启用自动跟单（通过配置管理器）
             if self.config_manager:
-                auto_follow_enabled = self.config_manager.get_enabled()
-                self.logger.info(f"⚙️  自动跟单配置状态: {'启用' if auto_follow_enabled else '禁用'}")
+                auto_follow_enabled = cfg.get('enabled', False)
+                self.logger.info("⚙️  自动跟单配置状态: %s", '启用' if auto_follow_enabled else '禁用')
                 
                 if not auto_follow_enabled:
                     self.logger.warning("❌ 自动跟单功能未启用（配置文件中disabled），跳过")
@@ -167,74 +197,80 @@ class FollowTradeManager:
             # 检查是否为模拟运行模式
             is_dry_run = False
             if self.config_manager:
-                is_dry_run = self.config_manager.is_dry_run()
-                self.logger.info(f"🎭 运行模式: {'模拟运行（只记录日志）' if is_dry_run else '实盘运行（实际下单）'}")
+                is_dry_run = cfg.get('dry_run', False)
+                self.logger.info("🎭 运行模式: %s", '模拟运行（只记录日志）' if is_dry_run else '实盘运行（实际下单）')
                 if is_dry_run:
                     self.logger.info("🔸 模拟运行模式：只记录日志，不实际下单")
             
             # 过滤白名单模型
-            self.logger.info(f"")
-            self.logger.info(f"🔍 开始过滤白名单模型...")
-            filtered_trades = self._filter_whitelist_trades(trades)
+            self.logger.info("")
+            self.logger.info("🔍 开始过滤白名单模型...")
+            whitelist = cfg.get('whitelist_models', [])
+            filtered_trades = self._filter_whitelist_trades(trades, whitelist_set)
             
-            whitelist = self.config_manager.get_whitelist_models() if self.config_manager else []
-            self.logger.info(f"   白名单配置: {whitelist if whitelist else '全部模型'}")
-            self.logger.info(f"   过滤前交易数: {len(trades)}")
-            self.logger.info(f"   过滤后交易数: {len(filtered_trades)}")
+            self.logger.info("   白名单配置: %s", whitelist if whitelist else '全部模型')
+            self.logger.info("   过滤前交易数: %s", len(trades))
+            self.logger.info("   过滤后交易数: %s", len(filtered_trades))
             
             if not filtered_trades:
                 self.logger.warning("❌ 没有符合白名单条件的交易，跳过跟单")
                 return results
             
-            self.logger.info(f"")
-            self.logger.info(f"✅ 准备在 {len(enabled_platforms)} 个平台执行 {len(filtered_trades)} 个跟单交易")
-            self.logger.info(f"{'='*80}")
+            self.logger.info("")
+            self.logger.info("✅ 准备在 %s 个平台执行 %s 个跟单交易", len(enabled_platforms), len(filtered_trades))
+            self.logger.info("%s", _BAR)
+            
+            # 循环内不变的配置项提前取出
+            scale_ratio = cfg.get('scale_ratio', 0.1) if self.config_manager else 0.1
+            notify = bool(self.config_manager) and cfg.get('notification_on_trade', True)
             
             # 在每个启用的平台上执行跟单
             for platform_name, platform_info in enabled_platforms.items():
                 executor = platform_info['executor']
                 
                 try:
-                    self.logger.info(f"📊 开始在 {platform_name} 平台执行跟单...")
+                    self.logger.info("📊 开始在 %s 平台执行跟单...", platform_name)
                     
                     # 更新缩放比例（可能在 Web 界面中被修改）
                     if self.config_manager:
-                        scale_ratio = self.config_manager.get_scale_ratio()
                         executor.scale_ratio = scale_ratio
                     
                     # 执行跟单
                     if is_dry_run:
-                        # 模拟运行：只记录日志
-                        for trade in filtered_trades:
-                            self.logger.info(f"🔸 [模拟-{platform_name}] 跟单交易: {trade.get('message', '')}")
+                        # 模拟运行：只记录日志（合并为一条）
+                        if info_enabled:
+                            self.logger.info("🔸 [模拟-%s] 跟单 %d 笔:\n%s", platform_name, len(filtered_trades),
+                                             "\n".join(f"   - {t.get('message', '')}" for t in filtered_trades))
                         result = {'success': len(filtered_trades), 'failed': 0, 'details': []}
                     else:
                         # 实际执行
                         result = executor.execute_trades(filtered_trades)
                     
                     results[platform_name] = result
-                    self.logger.info(f"✅ {platform_name} 跟单完成: 成功 {result['success']}, 失败 {result['failed']}")
+                    self.logger.info("✅ %s 跟单完成: 成功 %s, 失败 %s", platform_name, result['success'], result['failed'])
                     
                     # 发送通知
-                    if self.config_manager and self.config_manager.load_config().get('notification_on_trade', True):
-                        self._send_trade_notification(platform_name, result, filtered_trades, is_dry_run)
+                    if notify:
+                        self._send_trade_notification(platform_name, result, filtered_trades,
+                                                      is_dry_run, scale_ratio)
                     
                 except Exception as e:
-                    self.logger.error(f"❌ {platform_name} 平台跟单执行失败: {e}")
+                    self.logger.error("❌ %s 平台跟单执行失败: %s", platform_name, e)
                     results[platform_name] = {'success': 0, 'failed': len(filtered_trades), 'error': str(e)}
             
             return results
             
         except Exception as e:
-            self.logger.error(f"执行跟单时发生错误: {e}")
+            self.logger.error("执行跟单时发生错误: %s", e)
             return results
     
-    def _filter_whitelist_trades(self, trades: List[Dict]) -> List[Dict]:
+    def _filter_whitelist_trades(self, trades: List[Dict], whitelist_set: frozenset) -> List[Dict]:
         """
         过滤白名单模型的交易
         
         Args:
             trades: 所有交易列表
+            whitelist_set: 白名单模型集合（为空表示跟随所有模型）
             
         Returns:
             符合白名单的交易列表
@@ -243,23 +279,23 @@ class FollowTradeManager:
             return trades
         
         filtered_trades = []
-        whitelist = self.config_manager.get_whitelist_models()
         
         for trade in trades:
             model_id = trade.get('model_id', '')
             trade_message = trade.get('message', '未知交易')
             
             # 检查是否在白名单中
-            if self.config_manager.is_model_whitelisted(model_id):
+            if not whitelist_set or model_id in whitelist_set:
                 filtered_trades.append(trade)
-                self.logger.info(f"   ✅ [{model_id}] {trade_message}")
+                self.logger.info("   ✅ [%s] %s", model_id, trade_message)
             else:
-                self.logger.info(f"   ⏭️ [{model_id}] {trade_message} - 不在白名单中")
+                self.logger.info("   ⏭️ [%s] %s - 不在白名单中", model_id, trade_message)
         
         return filtered_trades
     
     def _send_trade_notification(self, platform_name: str, result: Dict, 
-                                 trades: List[Dict], is_dry_run: bool) -> None:
+                                 trades: List[Dict], is_dry_run: bool,
+                                 scale_ratio: float = 0.1) -> None:
         """
         发送跟单执行结果通知
         
@@ -268,47 +304,66 @@ class FollowTradeManager:
             result: 执行结果 {'success': int, 'failed': int}
             trades: 交易列表
             is_dry_run: 是否为模拟运行
+            scale_ratio: 缩放比例（用于通知展示）
         """
         try:
             mode_text = "【模拟运行】" if is_dry_run else ""
-            scale_ratio = self.config_manager.get_scale_ratio() if self.config_manager else 0.1
             
-            message = (
+            parts = [
                 f"🤖 **{platform_name.upper()} 跟单执行报告** {mode_text}\n\n"
-                f"⏰ 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"⏰ 时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"📊 跟单数量: {len(trades)}\n"
                 f"✅ 成功: {result['success']}\n"
                 f"❌ 失败: {result['failed']}\n"
                 f"📉 缩放比例: {scale_ratio}\n\n"
-            )
+            ]
             
             # 添加交易详情
             for i, trade in enumerate(trades[:5], 1):  # 最多显示 5 个
-                message += f"{i}. {trade.get('message', '未知交易')}\n"
+                parts.append(f"{i}. {trade.get('message', '未知交易')}\n")
             
             if len(trades) > 5:
-                message += f"\n... 还有 {len(trades) - 5} 个交易"
+                parts.append(f"\n... 还有 {len(trades) - 5} 个交易")
             
-            # 发送到企业微信
-            if self.notifiers['wechat']:
-                try:
-                    import requests
-                    message_data = {"msgtype": "markdown", "markdown": {"content": message}}
-                    wechat_url = self.notifiers['wechat']
-                    requests.post(wechat_url, json=message_data, 
-                                headers={'Content-Type': 'application/json'}, timeout=10)
-                except Exception as e:
-                    self.logger.error(f"发送 {platform_name} 跟单通知到企业微信失败: {e}")
+            message = "".join(parts)
             
-            # 发送到 Telegram
+            # 企业微信和 Telegram 并行发送（后台执行，不等待结果）
+            if self.notifiers['wechat']:
+                self._notify_pool.submit(self._post_wechat, platform_name, message)
             if self.notifiers['telegram']:
-                try:
-                    self.notifiers['telegram'].send_plain(message)
-                except Exception as e:
-                    self.logger.error(f"发送 {platform_name} 跟单通知到 Telegram 失败: {e}")
+                self._notify_pool.submit(self._post_telegram, platform_name, message)
                     
         except Exception as e:
-            self.logger.error(f"发送 {platform_name} 跟单通知时发生错误: {e}")
+            self.logger.error("发送 %s 跟单通知时发生错误: %s", platform_name, e)
+    
+    def _post_wechat(self, platform_name: str, message: str) -> None:
+        """
+        发送跟单通知到企业微信
+        
+        Args:
+            platform_name: 平台名称
+            message: 通知内容
+        """
+        try:
+            message_data = {"msgtype": "markdown", "markdown": {"content": message}}
+            wechat_url = self.notifiers['wechat']
+            self._http.post(wechat_url, json=message_data,
+                            headers={'Content-Type': 'application/json'}, timeout=WECHAT_REQUEST_TIMEOUT)
+        except Exception as e:
+            self.logger.error("发送 %s 跟单通知到企业微信失败: %s", platform_name, e)
+    
+    def _post_telegram(self, platform_name: str, message: str) -> None:
+        """
+        发送跟单通知到 Telegram
+        
+        Args:
+            platform_name: 平台名称
+            message: 通知内容
+        """
+        try:
+            self.notifiers['telegram'].send_plain(message)
+        except Exception as e:
+            self.logger.error("发送 %s 跟单通知到 Telegram 失败: %s", platform_name, e)
     
     def get_platform_status(self) -> Dict[str, Dict]:
         """
@@ -322,7 +377,7 @@ class FollowTradeManager:
             executor = platform_info['executor']
             status[platform_name] = {
                 'enabled': platform_info['enabled'],
-                'scale_ratio': executor.scale_ratio if hasattr(executor, 'scale_ratio') else None,
+                'scale_ratio': getattr(executor, 'scale_ratio', None),
             }
         return status
 
@@ -4,13 +4,14 @@ AI交易监控系统主程序
 监控AI大模型的加密货币交易行为，并在有变化时发送企业微信通知
 """
 import os
+import re
 import sys
 import logging
 import argparse
 from typing import Optional, List
-from dotenv import load_dotenv
 
-from trading_monitor import TradingMonitor
+# MONITORED_MODELS 分隔符（逗号及其两侧空白）
+_MODEL_SPLIT = re.compile(r'\s*,\s*')
 
 
 def setup_logging(log_level: str = "INFO"):
@@ -20,10 +21,13 @@ def setup_logging(log_level: str = "INFO"):
     Args:
         log_level: 日志级别
     """
+    # 避免重复初始化导致 handler 重复
+    if getattr(setup_logging, '_done', False):
+        return
+    
     # 创建日志目录
     log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
     
     # 配置日志格式
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -42,6 +46,7 @@ def setup_logging(log_level: str = "INFO"):
             logging.StreamHandler(sys.stdout)
         ]
     )
+    setup_logging._done = True
 
 
 def load_config() -> dict:
@@ -51,6 +56,8 @@ def load_config() -> dict:
     Returns:
         配置字典
     """
+    from dotenv import load_dotenv
+    
     # 尝试加载.env文件
     env_file = ".env"
     if not os.path.exists(env_file):
@@ -82,7 +89,7 @@ def load_config() -> dict:
     
     # 处理监控模型列表
     if config['monitored_models']:
-        config['monitored_models'] = [model.strip() for model in config['monitored_models'].split(',') if model.strip()]
+        config['monitored_models'] = [model for model in _MODEL_SPLIT.split(config['monitored_models'].strip()) if model]
     else:
         config['monitored_models'] = None
     
@@ -125,7 +132,8 @@ def main():
         if config['api_url'].endswith('/account-totals'):
             config['api_url'] = config['api_url'].replace('/account-totals', '')
         
-        # 创建监控器
+        # 创建监控器（延迟导入，避免 --help 等场景加载整个交易模块）
+        from trading_monitor import TradingMonitor
         monitor = TradingMonitor(
             api_url=config['api_url'],
             wechat_webhook_url=config['wechat_webhook_url'],
@@ -2,19 +2,125 @@
 持仓数据获取模块
 负责从API获取持仓数据并保存到本地文件
 """
+import hashlib
 import json
 import logging
 import os
-from venv import logger
+import time
 
 import requests
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson  # 可选依赖，存在时用于更快的 JSON 编解码
+except ImportError:
+    orjson = None
+
+
+# lastHourlyMarker 基准时间：2025年10月18日6:00:00（本地时间）
+_BASE_TIME = datetime(2025, 10, 18, 6, 0, 0, 0)
+_BASE_TS = _BASE_TIME.timestamp()
+
+
+def _json_loads(raw: bytes) -> Any:
+    """解析 JSON（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _payload_digest(raw: bytes) -> bytes:
+    """计算响应体摘要，用作转换结果缓存的键"""
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _write_json(filename: str, data: Any) -> None:
+    """
+    将数据以 UTF-8 紧凑格式原子写入 JSON 文件（优先使用 orjson）
+    先写入临时文件再 os.replace，避免写入中途崩溃导致文件损坏
+    
+    Args:
+        filename: 文件路径
+        data: 要写入的数据
+    """
+    tmp_filename = f"{filename}.tmp"
+    if orjson is not None:
+        with open(tmp_filename, 'wb', buffering=1 << 20) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(tmp_filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_filename, filename)
+
+
+# 旧格式持仓字段及其默认值
+_POSITION_DEFAULTS = {
+    'symbol': None,
+    'quantity': 0,
+    'leverage': 1,
+    'entry_price': 0,
+    'current_price': 0,
+    'margin': 0,
+    'unrealized_pnl': 0,
+    'closed_pnl': 0,
+    'risk_usd': 0,
+    'confidence': 0,
+    'entry_time': 0,
+    'liquidation_price': 0,
+    'commission': 0,
+    'slippage': 0,
+    'oid': 0,
+    'entry_oid': 0,
+    'tp_oid': -1,
+    'sl_oid': -1,
+    'wait_for_fill': False,
+    'index_col': None,
+    'exit_plan': None,  # 每次转换时单独创建，避免各持仓共享同一个字典
+}
+_POSITION_KEYS = _POSITION_DEFAULTS.keys()
+
+
+def _convert_position(position_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+    """
+    将单个交易对的持仓信息转换为旧格式
+    
+    Args:
+        position_data: API 返回的持仓信息
+        symbol: 交易对
+        
+    Returns:
+        旧格式的持仓信息
+    """
+    if position_data.keys() <= _POSITION_KEYS:
+        # 常见情况：API 只返回已知字段，直接与默认值合并
+        converted = {**_POSITION_DEFAULTS, **position_data, 'symbol': symbol}
+    else:
+        # 含有未知字段时只保留旧格式字段
+        g = position_data.get
+        converted = {key: g(key, default) for key, default in _POSITION_DEFAULTS.items()}
+        converted['symbol'] = symbol
+    converted['exit_plan'] = position_data.get('exit_plan') or {}
+    return converted
+
 
 class PositionDataFetcher:
     """持仓数据获取器"""
     
+    # 排行榜模型列表的本地缓存（排行榜很少变化，避免每次启动都请求）
+    LEADERBOARD_CACHE_FILE = os.path.join('.cache', 'leaderboard.json')
+    LEADERBOARD_CACHE_TTL = 600  # 秒
+    
+    # 转换结果 LRU 缓存容量（按响应体摘要缓存）
+    CONVERT_CACHE_SIZE = 8
+    
+    # 每小时开始后的这段时间内并行预取前1小时数据（新小时数据常缺模型），其余时间按需获取
+    PREVIOUS_HOUR_PREFETCH_WINDOW = 600  # 秒
+    
     def __init__(self, api_url: str, save_history_data: bool = False):
         """
         初始化持仓数据获取器
@@ -26,14 +132,111 @@ class PositionDataFetcher:
         self.api_url = api_url
         self.save_history_data = save_history_data
         self.logger = logging.getLogger(__name__)
+        
+        # 复用连接（keep-alive），对 GET 请求的临时性错误自动重试
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # 用于在整点附近并行预取前1小时数据（补齐缺失模型时无需再串行等待）
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='position-prefetch')
+        
+        # 条件请求缓存：上次当前小时响应的 ETag/Last-Modified 及解析结果
+        self._cached_marker: Optional[int] = None
+        self._cached_validators: Dict[str, str] = {}
+        self._cached_payload: Optional[Dict[str, Any]] = None
+        self._cached_digest: Optional[bytes] = None
+        
+        # 响应体摘要 -> 转换后的持仓列表（只读共享）
+        self._convert_cache: "OrderedDict[bytes, list]" = OrderedDict()
+        
         self.models = self.get_models()
+        self._models_set = set(self.models)
+        
+        # 已确认存在的目录，避免每次保存都检查
+        self._ensured_dirs: set = set()
 
     def get_models(self):
-        response = requests.get(f"{self.api_url}/leaderboard")
+        """
+        获取排行榜中的模型ID列表（优先使用未过期的本地缓存）
+        
+        Returns:
+            模型ID列表
+        """
+        cached = self._load_cached_models()
+        if cached is not None:
+            self.logger.info("get leaderboard models (cached): %s", cached)
+            return cached
+        
+        response = self.session.get(f"{self.api_url}/leaderboard", timeout=(5, 60))
         response.raise_for_status()
-        models = [m['id'] for m in response.json().get('leaderboard', [])]
-        self.logger.info(f"get leaderboard models: {models}")
+        models = [m['id'] for m in _json_loads(response.content).get('leaderboard', [])]
+        self.logger.info("get leaderboard models: %s", models)
+        
+        try:
+            os.makedirs(os.path.dirname(self.LEADERBOARD_CACHE_FILE), exist_ok=True)
+            _write_json(self.LEADERBOARD_CACHE_FILE, {'api_url': self.api_url, 'models': models})
+        except Exception as e:
+            self.logger.warning("写入排行榜缓存失败: %s", e)
         return models
+    
+    def _load_cached_models(self) -> Optional[list]:
+        """
+        读取本地排行榜缓存
+        
+        Returns:
+            缓存未过期且属于当前 API 时返回模型列表，否则返回 None
+        """
+        try:
+            if time.time() - os.stat(self.LEADERBOARD_CACHE_FILE).st_mtime >= self.LEADERBOARD_CACHE_TTL:
+                return None
+            with open(self.LEADERBOARD_CACHE_FILE, 'rb') as f:
+                cached = _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+        
+        if cached.get('api_url') != self.api_url:
+            return None
+        return cached.get('models')
+
+    def _fetch_account_totals(self, hourly_marker: int) -> Tuple[Dict[str, Any], bytes]:
+        """
+        获取指定小时标记的 account-totals 数据
+        
+        Args:
+            hourly_marker: lastHourlyMarker 参数
+            
+        Returns:
+            (解析后的响应数据, 响应体摘要)
+        """
+        response = self.session.get(f'{self.api_url}/account-totals?lastHourlyMarker={hourly_marker}', timeout=(5, 60))
+        response.raise_for_status()
+        return _json_loads(response.content), _payload_digest(response.content)
+
+    def _remember_payload(self, hourly_marker: int, response: requests.Response,
+                          data: Dict[str, Any]) -> None:
+        """
+        记录响应的缓存校验头及解析结果，供下次条件请求使用
+        
+        Args:
+            hourly_marker: 本次请求的小时标记
+            response: 响应对象
+            data: 解析后的数据（调用方应使用其浅拷贝，只替换键而不原地修改）
+        """
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        
+        self._cached_marker = hourly_marker
+        self._cached_validators = validators
+        self._cached_payload = data if validators else None
+        self._cached_digest = _payload_digest(response.content) if validators else None
 
     def _calculate_last_hourly_marker(self) -> int:
         """
@@ -43,24 +246,11 @@ class PositionDataFetcher:
         Returns:
             小时数标记
         """
-        try:
-            # 基准时间：2025年10月18日6:00:00
-            base_time = datetime(2025, 10, 18, 6, 0, 0, 0)
-            current_time = datetime.now()
-            
-            # 计算时间差（秒）
-            time_diff_seconds = current_time.timestamp() - base_time.timestamp()
-            
-            # 转换为小时数
-            hourly_marker = int(time_diff_seconds / 3600)
-            
-            self.logger.debug(f"计算lastHourlyMarker: {hourly_marker} (基准时间: {base_time}, 当前时间: {current_time})")
-            return hourly_marker
-            
-        except Exception as e:
-            self.logger.error(f"计算lastHourlyMarker失败: {e}")
-            # 返回默认值
-            return 129
+        # 转换为小时数
+        hourly_marker = int((time.time() - _BASE_TS) / 3600)
+        
+        self.logger.debug("计算lastHourlyMarker: %s (基准时间: %s)", hourly_marker, _BASE_TIME)
+        return hourly_marker
     
     def save_data_to_file(self, data: Dict[str, Any], data_dir: str = "data") -> str:
         """
@@ -75,23 +265,22 @@ class PositionDataFetcher:
         """
         try:
             # 创建数据目录
-            if not os.path.exists(data_dir):
-                os.makedirs(data_dir)
-                self.logger.info(f"创建数据目录: {data_dir}")
+            if data_dir not in self._ensured_dirs:
+                os.makedirs(data_dir, exist_ok=True)
+                self._ensured_dirs.add(data_dir)
             
             # 生成时间戳文件名
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{data_dir}/positions_{timestamp}.json"
             
             # 保存数据
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            _write_json(filename, data)
             
-            self.logger.info(f"数据已保存到文件: {filename}")
+            self.logger.info("数据已保存到文件: %s", filename)
             return filename
             
         except Exception as e:
-            self.logger.error(f"保存数据到文件失败: {e}")
+            self.logger.error("保存数据到文件失败: %s", e)
             return ""
         
     def fetch_positions(self) -> Optional[Dict[str, Any]]:
@@ -108,58 +297,88 @@ class PositionDataFetcher:
             # 构建新的API URL
             api_url = f"{self.api_url}/account-totals?lastHourlyMarker={hourly_marker}"
             
-            self.logger.info(f"正在获取持仓数据: {api_url}")
+            self.logger.info("正在获取持仓数据: %s", api_url)
+            
+            # 整点后不久当前小时数据最可能缺模型，此时与当前小时请求并行预取前1小时数据
+            previous_future = None
+            if (time.time() - _BASE_TS) % 3600 < self.PREVIOUS_HOUR_PREFETCH_WINDOW:
+                previous_future = self._prefetch_pool.submit(self._fetch_account_totals, hourly_marker - 1)
             
-            # 发送GET请求获取数据
-            response = requests.get(api_url, timeout=60)
-            try:
-                data = response.json()
-            except Exception as e:
-                self.logger.error(f"解析数据失败: {e}，数据内容: {response.text}")
-                data = {
-                    'accountTotals': [],
-                }
-            data['accountTotals'] = [i for i in data.get("accountTotals", []) if i['model_id'] in self.models]
-            handled_models = [i['model_id'] for i in data.get("accountTotals", []) if i['model_id'] in self.models]
+            # 发送GET请求获取数据（同一小时内带上 ETag/Last-Modified 做条件请求）
+            headers = self._cached_validators if self._cached_marker == hourly_marker else {}
+            response = self.session.get(api_url, headers=headers, timeout=(5, 60))
+            if response.status_code == 304 and self._cached_payload is not None:
+                self.logger.debug("持仓数据未变化 (304)，复用上次解析结果")
+                data = dict(self._cached_payload)
+                payload_key = self._cached_digest
+            else:
+                try:
+                    payload = _json_loads(response.content)
+                    self._remember_payload(hourly_marker, response, payload)
+                    data = dict(payload)
+                    payload_key = _payload_digest(response.content)
+                except Exception as e:
+                    self.logger.error("解析数据失败: %s，数据内容: %s", e, response.text)
+                    data = {
+                        'accountTotals': [],
+                    }
+                    payload_key = None
+            wanted = self._models_set
+            filtered = []
+            handled_models = set()
+            for i in data.get("accountTotals", []):
+                model = i['model_id']
+                if model in wanted:
+                    filtered.append(i)
+                    handled_models.add(model)
+            data['accountTotals'] = filtered
 
             if len(self.models) != len(data['accountTotals']):
-                self.logger.info(f"小时数据缺失部分模型数据, 获取前1小时数据补齐")
-                response = requests.get(f'{self.api_url}/account-totals?lastHourlyMarker={hourly_marker - 1}', timeout=60)
-                response.raise_for_status()
-                previous_data = response.json()
+                self.logger.info("小时数据缺失部分模型数据, 获取前1小时数据补齐")
+                if previous_future is not None:
+                    previous_data, previous_key = previous_future.result()
+                else:
+                    previous_data, previous_key = self._fetch_account_totals(hourly_marker - 1)
+                payload_key = payload_key + previous_key if payload_key else None
                 try:
                     all_positions = previous_data.get("accountTotals", [])
                     for p in all_positions:
                         model = p['model_id']
-                        if model in self.models and model not in handled_models:
-                            handled_models.append(model)
+                        if model in wanted and model not in handled_models:
+                            handled_models.add(model)
                             data['accountTotals'].append(p)
-                        if len(handled_models) == len(self.models):
+                        if len(handled_models) == len(wanted):
                             break
                 except Exception as e:
-                    self.logger.error(f"解析前1小时数据有问题： {e}，前一小时数据内容: {previous_data}")
+                    self.logger.error("解析前1小时数据有问题： %s，前一小时数据内容: %s", e, previous_data)
+            elif previous_future is not None:
+                previous_future.cancel()
 
-            self.logger.info(f"all models id: {[i['id'] for i in data['accountTotals']]}")
+            info_enabled = self.logger.isEnabledFor(logging.INFO)
+            if info_enabled:
+                self.logger.info("all models id: %s", [i['id'] for i in data['accountTotals']])
             # 转换数据格式以保持向后兼容
-            converted_data = self._convert_to_legacy_format(data)
+            converted_data = self._convert_to_legacy_format(data, cache_key=payload_key,
+                                                            include_raw=self.save_history_data)
             
             # 如果转换后的数据为空，返回None
             if converted_data is None:
                 self.logger.info("API返回空数据，跳过本次检测")
                 return None
             
-            # 计算实际的模型数量和持仓数量
-            positions = converted_data.get('positions', [])
-            model_count = len(positions)
-            
-            # 计算总的持仓项数量（所有模型的所有交易对）
-            total_position_items = 0
-            if isinstance(positions, list):
-                for model in positions:
-                    if isinstance(model, dict) and 'positions' in model:
-                        total_position_items += len(model.get('positions', {}))
-            
-            self.logger.info(f"成功获取持仓数据，包含 {model_count} 个模型，{total_position_items} 个持仓项")
+            # 计算实际的模型数量和持仓数量（仅用于日志）
+            if info_enabled:
+                positions = converted_data.get('positions', [])
+                model_count = len(positions)
+                
+                # 计算总的持仓项数量（所有模型的所有交易对）
+                total_position_items = 0
+                if isinstance(positions, list):
+                    for model in positions:
+                        if isinstance(model, dict) and 'positions' in model:
+                            total_position_items += len(model.get('positions', {}))
+                
+                self.logger.info("成功获取持仓数据，包含 %s 个模型，%s 个持仓项", model_count, total_position_items)
             
             # 根据配置决定是否保存到data目录
             if self.save_history_data:
@@ -171,21 +390,25 @@ class PositionDataFetcher:
             return converted_data
 
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"获取持仓数据失败: {e}")
+            self.logger.error("获取持仓数据失败: %s", e)
             return None
         except json.JSONDecodeError as e:
-            self.logger.error(f"解析JSON数据失败: {e}")
+            self.logger.error("解析JSON数据失败: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"获取持仓数据时发生未知错误: {e}")
+            self.logger.error("获取持仓数据时发生未知错误: %s", e)
             return None
 
-    def _convert_to_legacy_format(self, new_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _convert_to_legacy_format(self, new_data: Dict[str, Any],
+                                  cache_key: Optional[bytes] = None,
+                                  include_raw: bool = False) -> Dict[str, Any]:
         """
         将新的API数据格式转换为旧的格式以保持向后兼容
         
         Args:
             new_data: 新API返回的数据
+            cache_key: 原始响应体摘要，相同摘要直接复用缓存的转换结果
+            include_raw: 是否在结果中保留原始数据（raw_data）
             
         Returns:
             转换后的数据格式，如果数据为空则返回None
@@ -198,65 +421,74 @@ class PositionDataFetcher:
                 self.logger.warning("API返回空数据，跳过本次检测")
                 return {}
             
-            converted_positions = []
-            
-            for account in account_totals:
-                model_id = account.get('model_id', 'unknown')
-                positions = account.get('positions', {})
-                
-                # 转换每个模型的持仓数据
-                converted_model = {
-                    'id': model_id,
-                    'timestamp': account.get('timestamp', 0),
-                    'realized_pnl': account.get('realized_pnl', 0),
-                    'positions': {}
-                }
-                
-                # 转换每个交易对的持仓信息
-                for symbol, position_data in positions.items():
-                    converted_model['positions'][symbol] = {
-                        'symbol': symbol,
-                        'quantity': position_data.get('quantity', 0),
-                        'leverage': position_data.get('leverage', 1),
-                        'entry_price': position_data.get('entry_price', 0),
-                        'current_price': position_data.get('current_price', 0),
-                        'margin': position_data.get('margin', 0),
-                        'unrealized_pnl': position_data.get('unrealized_pnl', 0),
-                        'closed_pnl': position_data.get('closed_pnl', 0),
-                        'risk_usd': position_data.get('risk_usd', 0),
-                        'confidence': position_data.get('confidence', 0),
-                        'entry_time': position_data.get('entry_time', 0),
-                        'liquidation_price': position_data.get('liquidation_price', 0),
-                        'commission': position_data.get('commission', 0),
-                        'slippage': position_data.get('slippage', 0),
-                        'oid': position_data.get('oid', 0),
-                        'entry_oid': position_data.get('entry_oid', 0),
-                        'tp_oid': position_data.get('tp_oid', -1),
-                        'sl_oid': position_data.get('sl_oid', -1),
-                        'wait_for_fill': position_data.get('wait_for_fill', False),
-                        'index_col': position_data.get('index_col'),
-                        'exit_plan': position_data.get('exit_plan', {})
-                    }
-                
-                converted_positions.append(converted_model)
+            if cache_key is not None and cache_key in self._convert_cache:
+                # 相同响应体：复用上次的转换结果
+                self._convert_cache.move_to_end(cache_key)
+                converted_positions = self._convert_cache[cache_key]
+            else:
+                converted_positions = self._convert_positions(account_totals)
+                if cache_key is not None:
+                    self._convert_cache[cache_key] = converted_positions
+                    if len(self._convert_cache) > self.CONVERT_CACHE_SIZE:
+                        self._convert_cache.popitem(last=False)
             
             # 返回兼容的格式
-            return {
+            now = datetime.now()
+            result = {
                 'positions': converted_positions,
-                'fetch_time': datetime.now().isoformat(),
-                'timestamp': datetime.now().timestamp(),
-                'raw_data': new_data  # 保留原始数据以备后用
+                'fetch_time': now.isoformat(),
+                'timestamp': now.timestamp(),
             }
+            if include_raw:
+                result['raw_data'] = new_data  # 保留原始数据以备后用
+            return result
             
         except Exception as e:
-            self.logger.error(f"转换数据格式失败: {e}")
+            self.logger.error("转换数据格式失败: %s", e)
             # 返回空数据
-            return {
+            now = datetime.now()
+            result = {
                 'positions': [],
-                'fetch_time': datetime.now().isoformat(),
-                'timestamp': datetime.now().timestamp(),
-                'raw_data': new_data
+                'fetch_time': now.isoformat(),
+                'timestamp': now.timestamp(),
+            }
+            if include_raw:
+                result['raw_data'] = new_data
+            return result
+    
+    def _convert_positions(self, account_totals: list) -> list:
+        """
+        将 accountTotals 转换为旧格式的模型持仓列表
+        
+        Args:
+            account_totals: API 返回的 accountTotals 列表
+            
+        Returns:
+            转换后的模型持仓列表
+        """
+        converted_positions = []
+        
+        for account in account_totals:
+            model_id = account.get('model_id', 'unknown')
+            positions = account.get('positions', {})
+            
+            # 转换每个模型的持仓数据
+            converted_model = {
+                'id': model_id,
+                'timestamp': account.get('timestamp', 0),
+                'realized_pnl': account.get('realized_pnl', 0),
+                'positions': {}
             }
+            
+            # 转换每个交易对的持仓信息
+            converted_model['positions'] = {
+                symbol: _convert_position(position_data, symbol)
+                for symbol, position_data in positions.items()
+            }
+            
+            converted_positions.append(converted_model)
+        
+        return converted_positions
     
     def save_positions(self, data: Dict[str, Any], filename: str = "current.json") -> bool:
         """
@@ -271,20 +503,20 @@ class PositionDataFetcher:
         """
         try:
             # 添加保存时间戳
+            now = datetime.now()
             data_with_timestamp = {
                 **data,
-                "fetch_time": datetime.now().isoformat(),
-                "timestamp": datetime.now().timestamp()
+                "fetch_time": now.isoformat(),
+                "timestamp": now.timestamp()
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data_with_timestamp, f, ensure_ascii=False, indent=2)
+            _write_json(filename, data_with_timestamp)
             
-            self.logger.info(f"持仓数据已保存到 {filename}")
+            self.logger.info("持仓数据已保存到 %s", filename)
             return True
             
         except Exception as e:
-            self.logger.error(f"保存持仓数据失败: {e}")
+            self.logger.error("保存持仓数据失败: %s", e)
             return False
     
     def load_positions(self, filename: str) -> Optional[Dict[str, Any]]:
@@ -299,17 +531,17 @@ class PositionDataFetcher:
         """
         try:
             if not os.path.exists(filename):
-                self.logger.warning(f"文件 {filename} 不存在")
+                self.logger.warning("文件 %s 不存在", filename)
                 return None
                 
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(filename, 'rb') as f:
+                data = _json_loads(f.read())
             
-            self.logger.info(f"成功加载持仓数据: {filename}")
+            self.logger.info("成功加载持仓数据: %s", filename)
             return data
             
         except Exception as e:
-            self.logger.error(f"加载持仓数据失败: {e}")
+            self.logger.error("加载持仓数据失败: %s", e)
             return None
     
     def rename_current_to_last(self) -> bool:
@@ -320,17 +552,13 @@ class PositionDataFetcher:
             重命名成功返回True，失败返回False
         """
         try:
-            if os.path.exists("current.json"):
-                if os.path.exists("last.json"):
-                    os.remove("last.json")  # 删除旧的last.json
-                
-                os.rename("current.json", "last.json")
-                self.logger.info("current.json 已重命名为 last.json")
-                return True
-            else:
-                self.logger.warning("current.json 文件不存在，无法重命名")
-                return False
-                
+            # os.replace 原子地覆盖 last.json，不存在两者都缺失的时间窗口
+            os.replace("current.json", "last.json")
+            self.logger.info("current.json 已重命名为 last.json")
+            return True
+        except FileNotFoundError:
+            self.logger.warning("current.json 文件不存在，无法重命名")
+            return False
         except Exception as e:
-            self.logger.error(f"重命名文件失败: {e}")
+            self.logger.error("重命名文件失败: %s", e)
             return False
@@ -22,16 +22,18 @@ Bitget 交易功能测试脚本
   
   python test_bitget_trading.py --flow       # 模拟完整流程
   python test_bitget_trading.py --real --flow   # 实际完整流程
+  python test_bitget_trading.py --real --flow --yes --step-delay 2  # 无人值守执行完整流程
 """
 
 import os
 import sys
 import logging
 import argparse
+import functools
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from dotenv import load_dotenv
-from bitget_trader_ccxt import BitgetTraderCCXT
-from bitget_multi_mode_trader import BitgetMultiModeTrader
+from typing import Any, Callable, Optional
 
 # 配置日志
 logging.basicConfig(
@@ -43,87 +45,114 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+_SEP = "=" * 80
+
+# 完整流程测试横幅（整块一条日志记录，运行时只填充时间与模式）
+_FULL_FLOW_BANNER = "\n".join([
+    "",
+    _SEP,
+    "🧪 Bitget 完整流程测试",
+    _SEP,
+    "📅 测试时间: {time}",
+    "🔸 运行模式: {mode}",
+    "",
+    "📝 测试流程:",
+    "  1️⃣  开仓: 买入 0.0001 BTC + 止盈止损",
+    "  2️⃣  加仓: 加仓 0.001 BTC",
+    "  3️⃣  减仓: 减仓 0.0005 BTC",
+    "  4️⃣  平仓: 完全平仓",
+    _SEP,
+    "",
+])
+
+# 交易模式（BITGET_TRADING_MODE）
+_MODE_NAMES = {0: "模拟盘", 1: "实盘", 2: "双盘同步"}
+_LIVE_MODES = frozenset({1, 2})  # 需要实盘 API 密钥
+_DEMO_MODES = frozenset({0, 2})  # 需要模拟盘 API 密钥
+_LIVE_KEYS = ('bitget_api_key', 'bitget_secret_key', 'bitget_passphrase')
+_DEMO_KEYS = ('bitget_demo_api_key', 'bitget_demo_secret_key', 'bitget_demo_passphrase')
+
 # 测试数据：从日志中提取的实际减仓交易
+# 同一批次的公共字段只定义一次，每行只保存各自不同的列
+_TEST_TRADE_COMMON = {
+    'model_name': 'DeepSeek V3', 'action': '减多', 'direction': 'long',
+    'timestamp': '2025-11-05T10:25:59.155184'
+}
+
+# (symbol, quantity, profit_target, stop_loss)
+_TEST_TRADE_ROWS = (
+    ('SOL', 4.43, 266.0, 227.0),
+    ('ONDO', 1196.8, 1.67, 1.45),
+    ('LINK', 16.64, 21.79, 18.91),
+    ('AAVE', 1.33, 405.0, 351.0),
+    ('ARB', 38.72, 1.149, 0.997),
+    ('SUI', 80.19, 4.81, 4.23),
+    ('DOGE', 1116.37, 0.41, 0.36),
+    ('TIA', 36.21, 9.01, 7.73),
+    ('WLD', 63.94, 4.31, 3.72),
+    ('SEI', 339.5, 0.632, 0.546),
+)
+
 TEST_TRADES = [
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'SOL', 'action': '减多',
-        'quantity': 4.43, 'direction': 'long', 'profit_target': '266', 'stop_loss': '227',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'ONDO', 'action': '减多',
-        'quantity': 1196.8, 'direction': 'long', 'profit_target': '1.67', 'stop_loss': '1.45',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'LINK', 'action': '减多',
-        'quantity': 16.64, 'direction': 'long', 'profit_target': '21.79', 'stop_loss': '18.91',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'AAVE', 'action': '减多',
-        'quantity': 1.33, 'direction': 'long', 'profit_target': '405', 'stop_loss': '351',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'ARB', 'action': '减多',
-        'quantity': 38.72, 'direction': 'long', 'profit_target': '1.149', 'stop_loss': '0.997',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'SUI', 'action': '减多',
-        'quantity': 80.19, 'direction': 'long', 'profit_target': '4.81', 'stop_loss': '4.23',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'DOGE', 'action': '减多',
-        'quantity': 1116.37, 'direction': 'long', 'profit_target': '0.41', 'stop_loss': '0.36',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'TIA', 'action': '减多',
-        'quantity': 36.21, 'direction': 'long', 'profit_target': '9.01', 'stop_loss': '7.73',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'WLD', 'action': '减多',
-        'quantity': 63.94, 'direction': 'long', 'profit_target': '4.31', 'stop_loss': '3.72',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    },
-    {
-        'model_name': 'DeepSeek V3', 'symbol': 'SEI', 'action': '减多',
-        'quantity': 339.5, 'direction': 'long', 'profit_target': '0.632', 'stop_loss': '0.546',
-        'timestamp': '2025-11-05T10:25:59.155184'
-    }
+    {**_TEST_TRADE_COMMON, 'symbol': symbol, 'quantity': quantity,
+     'profit_target': profit_target, 'stop_loss': stop_loss}
+    for symbol, quantity, profit_target, stop_loss in _TEST_TRADE_ROWS
 ]
 
 
 def load_config_from_env():
-    """从环境变量加载配置"""
-    load_dotenv()
+    """从环境变量加载配置（.env 未修改时复用上次结果，结果只读共享）"""
+    from dotenv import find_dotenv
+    
+    dotenv_path = find_dotenv()
+    dotenv_mtime = os.stat(dotenv_path).st_mtime if dotenv_path else None
+    return _load_config_cached(dotenv_path, dotenv_mtime)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(dotenv_path: str, dotenv_mtime: Optional[float]):
+    """
+    解析 .env 并构建配置（按 .env 路径和修改时间缓存）
+    
+    Args:
+        dotenv_path: .env 文件路径（未找到时为空字符串）
+        dotenv_mtime: .env 修改时间，变化时重新解析
+    """
+    from dotenv import dotenv_values
+    
+    # 不写入 os.environ：否则首次解析的值会被当作 shell 环境变量保留，.env 修改后重新解析也不会生效
+    file_values = dotenv_values(dotenv_path) if dotenv_path else {}
+    
+    def getenv(key: str, default: Optional[str] = None) -> Optional[str]:
+        """shell 环境变量优先，其次为 .env 中的值"""
+        value = os.environ.get(key)
+        if value is None:
+            value = file_values.get(key)
+        return default if value is None else value
     
     # 获取交易模式
-    trading_mode = int(os.getenv('BITGET_TRADING_MODE', '0'))
+    trading_mode = int(getenv('BITGET_TRADING_MODE', '0'))
     
     config = {
         # 实盘配置
-        'bitget_api_key': os.getenv('BITGET_API_KEY'),
-        'bitget_secret_key': os.getenv('BITGET_SECRET_KEY'),
-        'bitget_passphrase': os.getenv('BITGET_PASSPHRASE'),
+        'bitget_api_key': getenv('BITGET_API_KEY'),
+        'bitget_secret_key': getenv('BITGET_SECRET_KEY'),
+        'bitget_passphrase': getenv('BITGET_PASSPHRASE'),
         # 模拟盘配置
-        'bitget_demo_api_key': os.getenv('BITGET_DEMO_API_KEY'),
-        'bitget_demo_secret_key': os.getenv('BITGET_DEMO_SECRET_KEY'),
-        'bitget_demo_passphrase': os.getenv('BITGET_DEMO_PASSPHRASE'),
+        'bitget_demo_api_key': getenv('BITGET_DEMO_API_KEY'),
+        'bitget_demo_secret_key': getenv('BITGET_DEMO_SECRET_KEY'),
+        'bitget_demo_passphrase': getenv('BITGET_DEMO_PASSPHRASE'),
         # 其他配置
-        'bitget_scale_ratio': float(os.getenv('BITGET_SCALE_RATIO', '0.01')),  # 默认 1%
+        'bitget_scale_ratio': float(getenv('BITGET_SCALE_RATIO', '0.01')),  # 默认 1%
         'bitget_trading_mode': trading_mode,
     }
     
     # 根据交易模式验证配置
     mode = config['bitget_trading_mode']
     
-    if mode == 1 or mode == 2:  # 需要实盘配置
-        if not all([config['bitget_api_key'], config['bitget_secret_key'], config['bitget_passphrase']]):
+    if mode in _LIVE_MODES:  # 需要实盘配置
+        if not all(config[key] for key in _LIVE_KEYS):
             logger.error("❌ 错误: 实盘模式需要配置实盘 API 密钥")
             logger.error("请在 .env 文件中配置以下变量：")
             logger.error("  - BITGET_API_KEY")
@@ -131,8 +160,8 @@ def load_config_from_env():
             logger.error("  - BITGET_PASSPHRASE")
             sys.exit(1)
     
-    if mode == 0 or mode == 2:  # 需要模拟盘配置
-        if not all([config['bitget_demo_api_key'], config['bitget_demo_secret_key'], config['bitget_demo_passphrase']]):
+    if mode in _DEMO_MODES:  # 需要模拟盘配置
+        if not all(config[key] for key in _DEMO_KEYS):
             logger.error("❌ 错误: 模拟盘模式需要配置模拟盘 API 密钥")
             logger.error("请在 .env 文件中配置以下变量：")
             logger.error("  - BITGET_DEMO_API_KEY")
@@ -143,8 +172,7 @@ def load_config_from_env():
             sys.exit(1)
     
     # 显示当前模式
-    mode_names = {0: "模拟盘", 1: "实盘", 2: "双盘同步"}
-    logger.info(f"🎯 交易模式: {mode_names.get(mode, '未知')} (BITGET_TRADING_MODE={mode})")
+    logger.info("🎯 交易模式: %s (BITGET_TRADING_MODE=%s)", _MODE_NAMES.get(mode, '未知'), mode)
     
     return config
 
@@ -160,6 +188,9 @@ def init_trader_from_config(config: dict, scale_ratio: float = 1.0):
     Returns:
         交易器实例
     """
+    # 延迟导入 ccxt 相关模块，--help 等路径无需加载
+    from bitget_trader_ccxt import BitgetTraderCCXT, MARKETS_CACHE_FILE
+    
     mode = config['bitget_trading_mode']
     
     logger.info("🔧 正在初始化 Bitget 交易器...")
@@ -173,7 +204,8 @@ def init_trader_from_config(config: dict, scale_ratio: float = 1.0):
                 secret_key=config['bitget_demo_secret_key'],
                 passphrase=config['bitget_demo_passphrase'],
                 scale_ratio=scale_ratio,
-                env_name='模拟盘'
+                env_name='模拟盘',
+                markets_cache=MARKETS_CACHE_FILE  # 多次运行测试时复用已下载的市场信息
             )
             trader.load_markets()
             trader.test_connection()
@@ -186,7 +218,8 @@ def init_trader_from_config(config: dict, scale_ratio: float = 1.0):
                 secret_key=config['bitget_secret_key'],
                 passphrase=config['bitget_passphrase'],
                 scale_ratio=scale_ratio,
-                env_name='实盘'
+                env_name='实盘',
+                markets_cache=MARKETS_CACHE_FILE
             )
             trader.load_markets()
             trader.test_connection()
@@ -194,6 +227,7 @@ def init_trader_from_config(config: dict, scale_ratio: float = 1.0):
             
         elif mode == 2:  # 双盘
             logger.info("📌 使用双盘模式")
+            from bitget_multi_mode_trader import BitgetMultiModeTrader
             trader = BitgetMultiModeTrader(
                 mode=mode,
                 live_api_key=config['bitget_api_key'],
@@ -202,49 +236,85 @@ def init_trader_from_config(config: dict, scale_ratio: float = 1.0):
                 demo_api_key=config['bitget_demo_api_key'],
                 demo_secret_key=config['bitget_demo_secret_key'],
                 demo_passphrase=config['bitget_demo_passphrase'],
-                scale_ratio=scale_ratio
+                scale_ratio=scale_ratio,
+                markets_cache=MARKETS_CACHE_FILE
             )
             trader.test_connection()
             logger.info("✅ 双盘交易器初始化成功")
             
         else:
-            logger.error(f"❌ 未知的交易模式: {mode}")
+            logger.error("❌ 未知的交易模式: %s", mode)
             return None
         
         logger.info("")
         return trader
         
     except Exception as e:
-        logger.error(f"❌ 初始化失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ 初始化失败: %s", e)
         return None
 
 
+def confirm_or_cancel(assume_yes: bool = False) -> bool:
+    """
+    实盘操作前请求用户确认
+    
+    Args:
+        assume_yes: 为 True 时直接确认（--yes）
+        
+    Returns:
+        确认继续返回 True，取消返回 False
+    """
+    if assume_yes:
+        return True
+    
+    response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
+    if response != 'YES':
+        logger.info("❌ 测试已取消")
+        return False
+    return True
+
+
+def wait_next_step(step_name: str, assume_yes: bool = False, step_delay: float = 0):
+    """
+    完整流程中等待进入下一步
+    
+    Args:
+        step_name: 下一步名称
+        assume_yes: 为 True 时不等待输入，只休眠 step_delay 秒
+        step_delay: 自动继续前的等待秒数
+    """
+    if assume_yes:
+        if step_delay > 0:
+            time.sleep(step_delay)
+        return
+    input(f"\n按 Enter 继续下一步（{step_name}）...")
+
+
 def print_test_info(dry_run: bool, trades_to_test: list, config: dict = None):
     """打印测试信息"""
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("🧪 Bitget 交易功能测试")
-    logger.info("=" * 80)
-    logger.info(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}")
+    lines = [
+        "",
+        _SEP,
+        "🧪 Bitget 交易功能测试",
+        _SEP,
+        f"📅 测试时间: {datetime.now().strftime(_TIME_FORMAT)}",
+        f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}",
+    ]
     if config:
-        logger.info(f"📊 缩放比例: {config['bitget_scale_ratio']}")
-        mode_names = {0: "模拟盘", 1: "实盘", 2: "双盘同步"}
-        logger.info(f"🎯 交易模式: {mode_names.get(config['bitget_trading_mode'], '未知')}")
-    logger.info(f"📝 测试交易数: {len(trades_to_test)}")
-    logger.info("=" * 80)
-    logger.info("")
+        lines.append(f"📊 缩放比例: {config['bitget_scale_ratio']}")
+        lines.append(f"🎯 交易模式: {_MODE_NAMES.get(config['bitget_trading_mode'], '未知')}")
+    lines += [f"📝 测试交易数: {len(trades_to_test)}", _SEP, ""]
+    logger.info("\n".join(lines))
 
 
-def run_test(dry_run: bool = True, single_trade_index: int = None):
+def run_test(dry_run: bool = True, single_trade_index: int = None, assume_yes: bool = False):
     """
     运行减仓测试
     
     Args:
         dry_run: 是否模拟运行（True=只打印不下单，False=实际下单）
         single_trade_index: 如果指定，只测试指定索引的交易
+        assume_yes: 跳过实盘确认提示
     """
     # 加载配置
     logger.info("📋 正在加载配置...")
@@ -255,13 +325,13 @@ def run_test(dry_run: bool = True, single_trade_index: int = None):
     if single_trade_index is not None:
         if 0 <= single_trade_index < len(TEST_TRADES):
             trades_to_test = [TEST_TRADES[single_trade_index]]
-            logger.info(f"📌 测试单个交易: 索引 {single_trade_index}")
+            logger.info("📌 测试单个交易: 索引 %s", single_trade_index)
         else:
-            logger.error(f"❌ 无效的索引: {single_trade_index}，有效范围: 0-{len(TEST_TRADES)-1}")
+            logger.error("❌ 无效的索引: %s，有效范围: 0-%s", single_trade_index, len(TEST_TRADES)-1)
             return
     else:
         trades_to_test = TEST_TRADES
-        logger.info(f"📌 测试所有交易: 共 {len(trades_to_test)} 个")
+        logger.info("📌 测试所有交易: 共 %s 个", len(trades_to_test))
     
     # 打印测试信息
     print_test_info(dry_run, trades_to_test, config)
@@ -269,10 +339,8 @@ def run_test(dry_run: bool = True, single_trade_index: int = None):
     # 等待用户确认（实际下单模式）
     if not dry_run:
         logger.warning("⚠️  警告: 您即将在实盘环境进行交易！")
-        logger.warning(f"⚠️  将执行 {len(trades_to_test)} 个减仓操作，使用真实资金！")
-        response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
-        if response != 'YES':
-            logger.info("❌ 测试已取消")
+        logger.warning("⚠️  将执行 %s 个减仓操作，使用真实资金！", len(trades_to_test))
+        if not confirm_or_cancel(assume_yes):
             return
         logger.info("")
     
@@ -289,78 +357,27 @@ def run_test(dry_run: bool = True, single_trade_index: int = None):
     result = trader.execute_trades(trades_to_test, dry_run=dry_run)
     
     # 打印结果
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("📊 测试完成")
-    logger.info("=" * 80)
-    logger.info(f"✅ 成功: {result.get('success', 0)}")
-    logger.info(f"❌ 失败: {result.get('failed', 0)}")
-    logger.info("=" * 80)
+    logger.info("\n%s\n📊 测试完成\n%s\n✅ 成功: %s\n❌ 失败: %s\n%s",
+                _SEP, _SEP, result.get('success', 0), result.get('failed', 0), _SEP)
 
 
-def test_open_position(dry_run: bool = True):
-    """
-    测试开仓功能（买入 BTC 并设置止盈止损）
-    
-    Args:
-        dry_run: 是否模拟运行
-    """
-    # 加载配置
-    logger.info("📋 正在加载配置...")
-    config = load_config_from_env()
-    
-    # 测试参数
-    symbol = 'BTC/USDT:USDT'
-    amount = 0.0001  # 买入 0.0001 BTC
-    tp_price = 110000  # 止盈价格
-    sl_price = 100000  # 止损价格
-    
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("🧪 测试开仓买入 BTC（含止盈止损）")
-    logger.info("=" * 80)
-    logger.info(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}")
-    logger.info("")
-    logger.info(f"📊 交易参数:")
-    logger.info(f"   币种: {symbol}")
-    logger.info(f"   数量: {amount} BTC")
-    logger.info(f"   操作: 市价买入（做多）")
-    logger.info(f"   止盈: {tp_price}")
-    logger.info(f"   止损: {sl_price}")
-    logger.info("=" * 80)
-    logger.info("")
-    
-    # 等待用户确认（实际下单模式）
-    if not dry_run:
-        logger.warning("⚠️  警告: 您即将在实盘环境进行交易！")
-        logger.warning(f"⚠️  将买入 {amount} BTC，使用真实资金！")
-        response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
-        if response != 'YES':
-            logger.info("❌ 测试已取消")
-            return
-        logger.info("")
-    
-    # 初始化交易器
-    trader = init_trader_from_config(config, scale_ratio=1.0)
-    if not trader:
-        logger.error("❌ 交易器初始化失败")
-        return
-    
-    # 模拟运行模式
-    if dry_run:
-        logger.info("🔸 模拟运行模式：将模拟执行以下操作（不实际下单）")
-        logger.info("")
-        logger.info("操作: 市价买入（做多）")
-        logger.info(f"  交易对: {symbol}")
-        logger.info(f"  数量: {amount} BTC")
-        logger.info(f"  止盈: {tp_price}")
-        logger.info(f"  止损: {sl_price}")
-        logger.info("")
-        logger.info("✅ 模拟运行完成")
-        return
-    
-    # 实际执行
+@dataclass(frozen=True)
+class TradeSpec:
+    """单项交易测试的参数与展示文案"""
+    title: str                      # 横幅标题
+    operation: str                  # 交易参数中的操作说明
+    dry_run_operation: str          # 模拟运行时的操作说明
+    warning: str                    # 实盘确认前的警告（%s 为数量，无数量时为交易对）
+    execute: Callable[[Any, 'TradeSpec'], None]  # 实盘执行函数
+    symbol: str = 'BTC/USDT:USDT'
+    amount: Optional[float] = None
+    tp_price: Optional[float] = None
+    sl_price: Optional[float] = None
+    note: Optional[str] = None
+
+
+def _execute_open(trader, spec: TradeSpec):
+    """实际执行开仓：市价买入 -> 设置止盈止损 -> 查询持仓确认"""
     logger.info("🚀 开始执行实际交易...")
     logger.info("")
     
@@ -368,27 +385,27 @@ def test_open_position(dry_run: bool = True):
         # 步骤 1: 市价买入
         logger.info("📈 步骤 1/3: 市价买入 BTC")
         order = trader.place_order(
-            symbol=symbol,
+            symbol=spec.symbol,
             side='buy',
             order_type='market',
-            amount=amount
+            amount=spec.amount
         )
         
         if not order:
             logger.error("❌ 买入失败")
             return
         
-        logger.info(f"✅ 买入成功！订单ID: {order.get('id')}")
+        logger.info("✅ 买入成功！订单ID: %s", order.get('id'))
         logger.info("")
         
         # 步骤 2: 设置止盈止损
         logger.info("📈 步骤 2/3: 设置止盈止损")
         tp_sl_result = trader.set_take_profit_stop_loss(
-            symbol=symbol,
+            symbol=spec.symbol,
             side='sell',  # 平多仓用 sell
-            amount=amount,
-            take_profit_price=tp_price,
-            stop_loss_price=sl_price
+            amount=spec.amount,
+            take_profit_price=spec.tp_price,
+            stop_loss_price=spec.sl_price
         )
         
         if tp_sl_result.get('take_profit'):
@@ -399,292 +416,242 @@ def test_open_position(dry_run: bool = True):
         
         # 步骤 3: 查询持仓确认
         logger.info("📈 步骤 3/3: 查询持仓确认")
-        positions = trader.get_position(symbol)
+        positions = trader.get_position(spec.symbol)
         if positions:
             for pos in positions:
-                logger.info(f"✅ 持仓确认: {pos.get('side')} {pos.get('contracts')} 张")
+                logger.info("✅ 持仓确认: %s %s 张", pos.get('side'), pos.get('contracts'))
         logger.info("")
         
-        logger.info("=" * 80)
-        logger.info("✅ 开仓测试完成！")
-        logger.info("=" * 80)
+        logger.info("%s\n✅ 开仓测试完成！\n%s", _SEP, _SEP)
         
     except Exception as e:
-        logger.error(f"❌ 测试过程中发生错误: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ 测试过程中发生错误: %s", e)
 
 
-def test_add_position(dry_run: bool = True):
-    """
-    测试加仓功能（在已有持仓基础上加仓）
-    
-    Args:
-        dry_run: 是否模拟运行
-    """
-    # 加载配置
-    logger.info("📋 正在加载配置...")
-    config = load_config_from_env()
-    
-    # 测试参数
-    symbol = 'BTC/USDT:USDT'
-    amount = 0.001  # 加仓 0.001 BTC
-    
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("🧪 测试加仓 BTC")
-    logger.info("=" * 80)
-    logger.info(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}")
-    logger.info("")
-    logger.info(f"📊 交易参数:")
-    logger.info(f"   币种: {symbol}")
-    logger.info(f"   数量: {amount} BTC")
-    logger.info(f"   操作: 市价买入（加多仓）")
-    logger.info(f"   说明: 在已有持仓基础上增加仓位")
-    logger.info("=" * 80)
-    logger.info("")
-    
-    if not dry_run:
-        logger.warning("⚠️  警告: 您即将在实盘环境进行交易！")
-        logger.warning(f"⚠️  将加仓 {amount} BTC，使用真实资金！")
-        response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
-        if response != 'YES':
-            logger.info("❌ 测试已取消")
-            return
-        logger.info("")
-    
-    # 初始化交易器
-    trader = init_trader_from_config(config, scale_ratio=1.0)
-    if not trader:
-        logger.error("❌ 交易器初始化失败")
-        return
-    
-    if dry_run:
-        logger.info("🔸 模拟运行模式：将模拟执行以下操作（不实际下单）")
-        logger.info("")
-        logger.info("操作: 市价买入（加仓）")
-        logger.info(f"  交易对: {symbol}")
-        logger.info(f"  数量: {amount} BTC")
-        logger.info("")
-        logger.info("✅ 模拟运行完成")
-        return
-    
-    # 实际执行加仓
+def _execute_add(trader, spec: TradeSpec):
+    """实际执行加仓"""
     logger.info("🚀 开始执行加仓...")
     order = trader.place_order(
-        symbol=symbol,
+        symbol=spec.symbol,
         side='buy',
         order_type='market',
-        amount=amount
+        amount=spec.amount
     )
     
     if order:
-        logger.info(f"✅ 加仓成功！订单ID: {order.get('id')}")
+        logger.info("✅ 加仓成功！订单ID: %s", order.get('id'))
     else:
         logger.error("❌ 加仓失败")
 
 
-def test_reduce_position(dry_run: bool = True):
-    """
-    测试减仓功能
-    
-    Args:
-        dry_run: 是否模拟运行
-    """
-    # 加载配置
-    logger.info("📋 正在加载配置...")
-    config = load_config_from_env()
-    
-    # 测试参数
-    symbol = 'BTC/USDT:USDT'
-    amount = 0.0005  # 减仓 0.0005 BTC
-    
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("🧪 测试减仓 BTC")
-    logger.info("=" * 80)
-    logger.info(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}")
-    logger.info("")
-    logger.info(f"📊 交易参数:")
-    logger.info(f"   币种: {symbol}")
-    logger.info(f"   数量: {amount} BTC")
-    logger.info(f"   操作: 市价卖出（减多仓）")
-    logger.info(f"   说明: 部分平仓，保留部分持仓")
-    logger.info("=" * 80)
-    logger.info("")
-    
-    if not dry_run:
-        logger.warning("⚠️  警告: 您即将在实盘环境进行交易！")
-        logger.warning(f"⚠️  将减仓 {amount} BTC！")
-        response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
-        if response != 'YES':
-            logger.info("❌ 测试已取消")
-            return
-        logger.info("")
-    
-    # 初始化交易器
-    trader = init_trader_from_config(config, scale_ratio=1.0)
-    if not trader:
-        logger.error("❌ 交易器初始化失败")
-        return
-    
-    if dry_run:
-        logger.info("🔸 模拟运行模式：将模拟执行以下操作（不实际下单）")
-        logger.info("")
-        logger.info("操作: 市价卖出（减仓）")
-        logger.info(f"  交易对: {symbol}")
-        logger.info(f"  数量: {amount} BTC")
-        logger.info("")
-        logger.info("✅ 模拟运行完成")
-        return
-    
-    # 实际执行减仓
+def _execute_reduce(trader, spec: TradeSpec):
+    """实际执行减仓"""
     logger.info("🚀 开始执行减仓...")
     order = trader.place_order(
-        symbol=symbol,
+        symbol=spec.symbol,
         side='sell',
         order_type='market',
-        amount=amount,
+        amount=spec.amount,
         params={'reduceOnly': True}
     )
     
     if order:
-        logger.info(f"✅ 减仓成功！订单ID: {order.get('id')}")
+        logger.info("✅ 减仓成功！订单ID: %s", order.get('id'))
     else:
         logger.error("❌ 减仓失败")
 
 
-def test_close_position(dry_run: bool = True):
+def _execute_close(trader, spec: TradeSpec):
+    """实际执行平仓"""
+    logger.info("🚀 开始执行平仓...")
+    success = trader.close_all_positions(spec.symbol)
+    
+    if success:
+        logger.info("✅ 平仓完成")
+    else:
+        logger.error("❌ 平仓失败或无持仓")
+
+
+# 单项功能测试定义
+SPECS = {
+    'open': TradeSpec(
+        title="🧪 测试开仓买入 BTC（含止盈止损）",
+        operation="市价买入（做多）",
+        dry_run_operation="市价买入（做多）",
+        warning="⚠️  将买入 %s BTC，使用真实资金！",
+        execute=_execute_open,
+        amount=0.0001,  # 买入 0.0001 BTC
+        tp_price=110000.0,  # 止盈价格
+        sl_price=100000.0,  # 止损价格
+    ),
+    'add': TradeSpec(
+        title="🧪 测试加仓 BTC",
+        operation="市价买入（加多仓）",
+        dry_run_operation="市价买入（加仓）",
+        warning="⚠️  将加仓 %s BTC，使用真实资金！",
+        execute=_execute_add,
+        amount=0.001,  # 加仓 0.001 BTC
+        note="在已有持仓基础上增加仓位",
+    ),
+    'reduce': TradeSpec(
+        title="🧪 测试减仓 BTC",
+        operation="市价卖出（减多仓）",
+        dry_run_operation="市价卖出（减仓）",
+        warning="⚠️  将减仓 %s BTC！",
+        execute=_execute_reduce,
+        amount=0.0005,  # 减仓 0.0005 BTC
+        note="部分平仓，保留部分持仓",
+    ),
+    'close': TradeSpec(
+        title="🧪 测试平仓 BTC",
+        operation="市价平仓（平多仓）",
+        dry_run_operation="查询持仓并完全平仓",
+        warning="⚠️  将完全平仓 %s 所有持仓！",
+        execute=_execute_close,
+        note="完全平掉所有持仓",
+    ),
+}
+
+
+def _run_single_action(spec: TradeSpec, dry_run: bool = True, trader=None, assume_yes: bool = False):
     """
-    测试平仓功能（完全平掉所有持仓）
+    按测试定义执行单项交易测试（打印参数 -> 确认 -> 初始化 -> 模拟/实际执行）
     
     Args:
+        spec: 测试定义
         dry_run: 是否模拟运行
+        trader: 已初始化的交易器（可选，为空时按配置新建）
+        assume_yes: 跳过实盘确认提示
     """
     # 加载配置
     logger.info("📋 正在加载配置...")
     config = load_config_from_env()
     
-    # 测试参数
-    symbol = 'BTC/USDT:USDT'
-    
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("🧪 测试平仓 BTC")
-    logger.info("=" * 80)
-    logger.info(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}")
-    logger.info("")
-    logger.info(f"📊 交易参数:")
-    logger.info(f"   币种: {symbol}")
-    logger.info(f"   操作: 市价平仓（平多仓）")
-    logger.info(f"   说明: 完全平掉所有持仓")
-    logger.info("=" * 80)
-    logger.info("")
+    lines = [
+        "",
+        _SEP,
+        spec.title,
+        _SEP,
+        f"📅 测试时间: {datetime.now().strftime(_TIME_FORMAT)}",
+        f"🔸 运行模式: {'模拟运行（不实际下单）' if dry_run else '⚠️  实际下单模式'}",
+        "",
+        "📊 交易参数:",
+        f"   币种: {spec.symbol}",
+    ]
+    if spec.amount is not None:
+        lines.append(f"   数量: {spec.amount} BTC")
+    lines.append(f"   操作: {spec.operation}")
+    if spec.tp_price is not None:
+        lines.append(f"   止盈: {spec.tp_price}")
+        lines.append(f"   止损: {spec.sl_price}")
+    if spec.note:
+        lines.append(f"   说明: {spec.note}")
+    lines += [_SEP, ""]
+    logger.info("\n".join(lines))
     
+    # 等待用户确认（实际下单模式）
     if not dry_run:
         logger.warning("⚠️  警告: 您即将在实盘环境进行交易！")
-        logger.warning(f"⚠️  将完全平仓 {symbol} 所有持仓！")
-        response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
-        if response != 'YES':
-            logger.info("❌ 测试已取消")
+        logger.warning(spec.warning, spec.amount if spec.amount is not None else spec.symbol)
+        if not confirm_or_cancel(assume_yes):
             return
         logger.info("")
     
     # 初始化交易器
-    trader = init_trader_from_config(config, scale_ratio=1.0)
+    if trader is None:
+        trader = init_trader_from_config(config, scale_ratio=1.0)
     if not trader:
         logger.error("❌ 交易器初始化失败")
         return
     
+    # 模拟运行模式
     if dry_run:
         logger.info("🔸 模拟运行模式：将模拟执行以下操作（不实际下单）")
         logger.info("")
-        logger.info("操作: 查询持仓并完全平仓")
-        logger.info(f"  交易对: {symbol}")
+        logger.info("操作: %s", spec.dry_run_operation)
+        logger.info("  交易对: %s", spec.symbol)
+        if spec.amount is not None:
+            logger.info("  数量: %s BTC", spec.amount)
+        if spec.tp_price is not None:
+            logger.info("  止盈: %s", spec.tp_price)
+            logger.info("  止损: %s", spec.sl_price)
         logger.info("")
         logger.info("✅ 模拟运行完成")
         return
     
-    # 实际执行平仓
-    logger.info("🚀 开始执行平仓...")
-    success = trader.close_all_positions(symbol)
-    
-    if success:
-        logger.info("✅ 平仓完成")
-    else:
-        logger.error("❌ 平仓失败或无持仓")
+    # 实际执行
+    spec.execute(trader, spec)
+
+
+def test_open_position(dry_run: bool = True, trader=None, assume_yes: bool = False):
+    """测试开仓功能（买入 BTC 并设置止盈止损）"""
+    _run_single_action(SPECS['open'], dry_run, trader, assume_yes)
+
+
+def test_add_position(dry_run: bool = True, trader=None, assume_yes: bool = False):
+    """测试加仓功能（在已有持仓基础上加仓）"""
+    _run_single_action(SPECS['add'], dry_run, trader, assume_yes)
+
+
+def test_reduce_position(dry_run: bool = True, trader=None, assume_yes: bool = False):
+    """测试减仓功能"""
+    _run_single_action(SPECS['reduce'], dry_run, trader, assume_yes)
+
+
+def test_close_position(dry_run: bool = True, trader=None, assume_yes: bool = False):
+    """测试平仓功能（完全平掉所有持仓）"""
+    _run_single_action(SPECS['close'], dry_run, trader, assume_yes)
 
 
-def test_full_flow(dry_run: bool = True):
+def test_full_flow(dry_run: bool = True, assume_yes: bool = False, step_delay: float = 0):
     """
     测试完整流程：开仓 -> 加仓 -> 减仓 -> 平仓
     
     Args:
         dry_run: 是否模拟运行
+        assume_yes: 跳过确认提示，各步骤之间等待 step_delay 秒后自动继续
+        step_delay: 自动继续时各步骤之间的间隔（秒）
     """
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("🧪 Bitget 完整流程测试")
-    logger.info("=" * 80)
-    logger.info(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🔸 运行模式: {'模拟运行' if dry_run else '⚠️  实际下单'}")
-    logger.info("")
-    logger.info("📝 测试流程:")
-    logger.info("  1️⃣  开仓: 买入 0.0001 BTC + 止盈止损")
-    logger.info("  2️⃣  加仓: 加仓 0.001 BTC")
-    logger.info("  3️⃣  减仓: 减仓 0.0005 BTC")
-    logger.info("  4️⃣  平仓: 完全平仓")
-    logger.info("=" * 80)
-    logger.info("")
+    logger.info(_FULL_FLOW_BANNER.format_map({
+        'time': datetime.now().strftime(_TIME_FORMAT),
+        'mode': '模拟运行' if dry_run else '⚠️  实际下单',
+    }))
     
     if not dry_run:
         logger.warning("⚠️  警告: 您即将执行完整交易流程！")
-        response = input("\n确认继续吗? 输入 'YES' 继续，其他任意键取消: ")
-        if response != 'YES':
-            logger.info("❌ 测试已取消")
+        if not confirm_or_cancel(assume_yes):
             return
         logger.info("")
     
+    # 只初始化一次交易器，各步骤共享（避免重复加载市场信息和建立连接）
+    trader = init_trader_from_config(load_config_from_env(), scale_ratio=1.0)
+    if not trader:
+        logger.error("❌ 交易器初始化失败")
+        return
+    
     # 执行各步骤
-    logger.info("=" * 80)
-    logger.info("1️⃣  开始测试：开仓")
-    logger.info("=" * 80)
-    test_open_position(dry_run)
+    logger.info("%s\n1️⃣  开始测试：开仓\n%s", _SEP, _SEP)
+    test_open_position(dry_run, trader=trader, assume_yes=assume_yes)
     
     if not dry_run:
-        input("\n按 Enter 继续下一步（加仓）...")
+        wait_next_step("加仓", assume_yes, step_delay)
     
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("2️⃣  开始测试：加仓")
-    logger.info("=" * 80)
-    test_add_position(dry_run)
+    logger.info("\n%s\n2️⃣  开始测试：加仓\n%s", _SEP, _SEP)
+    test_add_position(dry_run, trader=trader, assume_yes=assume_yes)
     
     if not dry_run:
-        input("\n按 Enter 继续下一步（减仓）...")
+        wait_next_step("减仓", assume_yes, step_delay)
     
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("3️⃣  开始测试：减仓")
-    logger.info("=" * 80)
-    test_reduce_position(dry_run)
+    logger.info("\n%s\n3️⃣  开始测试：减仓\n%s", _SEP, _SEP)
+    test_reduce_position(dry_run, trader=trader, assume_yes=assume_yes)
     
     if not dry_run:
-        input("\n按 Enter 继续下一步（平仓）...")
+        wait_next_step("平仓", assume_yes, step_delay)
     
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("4️⃣  开始测试：平仓")
-    logger.info("=" * 80)
-    test_close_position(dry_run)
+    logger.info("\n%s\n4️⃣  开始测试：平仓\n%s", _SEP, _SEP)
+    test_close_position(dry_run, trader=trader, assume_yes=assume_yes)
     
-    logger.info("")
-    logger.info("=" * 80)
-    logger.info("✅ 完整流程测试完成！")
-    logger.info("=" * 80)
+    logger.info("\n%s\n✅ 完整流程测试完成！\n%s", _SEP, _SEP)
 
 
 def main():
@@ -713,6 +680,7 @@ def main():
   # ========== 完整流程测试 ==========
   python test_bitget_trading.py --flow           # 模拟完整流程
   python test_bitget_trading.py --real --flow    # 实际完整流程
+  python test_bitget_trading.py --real --flow --yes --step-delay 2  # 无人值守
         '''
     )
     
@@ -723,22 +691,25 @@ def main():
     parser.add_argument('--reduce', action='store_true', help='测试减仓功能')
     parser.add_argument('--close', action='store_true', help='测试平仓功能')
     parser.add_argument('--flow', action='store_true', help='测试完整流程')
+    parser.add_argument('--yes', action='store_true', help='跳过实盘确认提示（用于脚本/CI 执行）')
+    parser.add_argument('--step-delay', type=float, default=0, metavar='SECONDS',
+                        help='配合 --yes 使用：完整流程各步骤之间的等待秒数')
     
     args = parser.parse_args()
     dry_run = not args.real
     
     if args.flow:
-        test_full_flow(dry_run=dry_run)
+        test_full_flow(dry_run=dry_run, assume_yes=args.yes, step_delay=args.step_delay)
     elif args.open:
-        test_open_position(dry_run=dry_run)
+        test_open_position(dry_run=dry_run, assume_yes=args.yes)
     elif args.add:
-        test_add_position(dry_run=dry_run)
+        test_add_position(dry_run=dry_run, assume_yes=args.yes)
     elif args.reduce:
-        test_reduce_position(dry_run=dry_run)
+        test_reduce_position(dry_run=dry_run, assume_yes=args.yes)
     elif args.close:
-        test_close_position(dry_run=dry_run)
+        test_close_position(dry_run=dry_run, assume_yes=args.yes)
     else:
-        run_test(dry_run=dry_run, single_trade_index=args.single)
+        run_test(dry_run=dry_run, single_trade_index=args.single, assume_yes=args.yes)
 
 
 if __name__ == '__main__':
@@ -7,9 +7,40 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 
+# 持仓方向
+_LONG = "买多"
+_SHORT = "卖空"
+
+# 持仓变化动作：(数量变化符号, 是否多仓) -> 动作，数量不变表示只调整了杠杆
+_CHANGE_ACTIONS = {
+    (1, True): "加仓买多", (1, False): "加仓卖空",
+    (-1, True): "减仓买多", (-1, False): "减仓卖空",
+    (0, True): "调整买多杠杆", (0, False): "调整卖空杠杆",
+}
+
+# exit_plan 缺失时的只读默认值，避免每次构造空字典
+_EMPTY: Dict[str, Any] = {}
+
+
+def _position_fingerprint(pos: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    持仓指纹：只包含会触发交易变化的字段（数量、杠杆）
+    
+    Args:
+        pos: 单个交易对的持仓数据
+        
+    Returns:
+        (数量, 杠杆) 元组，指纹相同表示该交易对没有交易变化
+    """
+    return pos.get('quantity', 0), pos.get('leverage', 1)
+
+
 class TradeAnalyzer:
     """交易分析器"""
     
+    # 交易摘要中最多列出的交易数
+    MAX_SUMMARY_TRADES = 50
+    
     def __init__(self):
         """初始化交易分析器"""
         self.logger = logging.getLogger(__name__)
@@ -34,30 +65,36 @@ class TradeAnalyzer:
             last_positions = last_data.get('positions', [])
             current_positions = current_data.get('positions', [])
             
-            self.logger.debug(f"上次数据包含 {len(last_positions)} 个模型")
-            self.logger.debug(f"当前数据包含 {len(current_positions)} 个模型")
+            self.logger.debug("上次数据包含 %s 个模型", len(last_positions))
+            self.logger.debug("当前数据包含 %s 个模型", len(current_positions))
             
             # 创建模型字典便于查找
             last_models = {pos['id']: pos for pos in last_positions}
             current_models = {pos['id']: pos for pos in current_positions}
             
-            self.logger.debug(f"上次模型: {list(last_models.keys())}")
-            self.logger.debug(f"当前模型: {list(current_models.keys())}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("上次模型: %s", list(last_models.keys()))
+                self.logger.debug("当前模型: %s", list(current_models.keys()))
             
-            # 确定要检查的模型
-            models_to_check = set(last_models.keys()) | set(current_models.keys())
+            # 确定要检查的模型（指定了监控列表时只遍历监控列表，无需构造全量并集）
             if monitored_models:
                 self.logger.info(f"监控模型列表: {monitored_models}")
-                models_to_check = models_to_check & set(monitored_models)
+                models_to_check = [m for m in dict.fromkeys(monitored_models)
+                                   if m in last_models or m in current_models]
+            else:
+                models_to_check = last_models.keys() | current_models.keys()
             
             self.logger.info(f"开始分析 {len(models_to_check)} 个模型的持仓变化")
             
+            # 同一次分析产生的交易使用同一个时间戳
+            timestamp = datetime.now().isoformat()
+            
             for model_id in models_to_check:
                 last_model = last_models.get(model_id)
                 current_model = current_models.get(model_id)
                 
                 # 分析该模型的持仓变化
-                model_trades = self._analyze_model_changes(model_id, last_model, current_model)
+                model_trades = self._analyze_model_changes(model_id, last_model, current_model, timestamp)
                 trades.extend(model_trades)
             
             self.logger.info(f"检测到 {len(trades)} 个交易变化")
@@ -68,7 +105,7 @@ class TradeAnalyzer:
             return []
     
     def _analyze_model_changes(self, model_id: str, last_model: Optional[Dict], 
-                             current_model: Optional[Dict]) -> List[Dict[str, Any]]:
+                             current_model: Optional[Dict], timestamp: str) -> List[Dict[str, Any]]:
         """
         分析单个模型的持仓变化
         
@@ -76,6 +113,7 @@ class TradeAnalyzer:
             model_id: 模型ID
             last_model: 上次模型持仓数据
             current_model: 当前模型持仓数据
+            timestamp: 交易时间戳（ISO 格式）
             
         Returns:
             该模型的交易变化列表
@@ -90,7 +128,7 @@ class TradeAnalyzer:
                     'type': 'model_added',
                     'model_id': model_id,
                     'message': f"新模型 {model_id} 开始交易",
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 })
                 return trades
             
@@ -100,7 +138,7 @@ class TradeAnalyzer:
                     'type': 'model_removed',
                     'model_id': model_id,
                     'message': f"模型 {model_id} 停止交易",
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 })
                 return trades
             
@@ -111,14 +149,21 @@ class TradeAnalyzer:
             last_positions = last_model.get('positions', {})
             current_positions = current_model.get('positions', {})
             
-            # 检查所有交易对
-            all_symbols = set(last_positions.keys()) | set(current_positions.keys())
+            # 只检查有变化的交易对：新开仓、已平仓，以及两次都存在但指纹不同的
+            last_symbols = last_positions.keys()
+            current_symbols = current_positions.keys()
+            changed_symbols = [
+                symbol for symbol in last_symbols & current_symbols
+                if _position_fingerprint(last_positions[symbol]) != _position_fingerprint(current_positions[symbol])
+            ]
+            changed_symbols.extend(current_symbols - last_symbols)
+            changed_symbols.extend(last_symbols - current_symbols)
             
-            for symbol in all_symbols:
+            for symbol in changed_symbols:
                 last_pos = last_positions.get(symbol)
                 current_pos = current_positions.get(symbol)
                 
-                symbol_trades = self._analyze_symbol_changes(model_id, symbol, last_pos, current_pos)
+                symbol_trades = self._analyze_symbol_changes(model_id, symbol, last_pos, current_pos, timestamp)
                 trades.extend(symbol_trades)
             
             return trades
@@ -128,7 +173,8 @@ class TradeAnalyzer:
             return []
     
     def _analyze_symbol_changes(self, model_id: str, symbol: str, 
-                              last_pos: Optional[Dict], current_pos: Optional[Dict]) -> List[Dict[str, Any]]:
+                              last_pos: Optional[Dict], current_pos: Optional[Dict],
+                              timestamp: str) -> List[Dict[str, Any]]:
         """
         分析单个交易对的持仓变化
         
@@ -137,6 +183,7 @@ class TradeAnalyzer:
             symbol: 交易对符号
             last_pos: 上次持仓数据
             current_pos: 当前持仓数据
+            timestamp: 交易时间戳（ISO 格式）
             
         Returns:
             该交易对的交易变化列表
@@ -153,12 +200,9 @@ class TradeAnalyzer:
                 current_price = current_pos.get('current_price', 0)
                 
                 # 判断买卖方向
-                if quantity > 0:
-                    direction = "买多"
-                else:
-                    direction = "卖空"
+                direction = _LONG if quantity > 0 else _SHORT
                 
-                exit_plan = current_pos.get('exit_plan', {})
+                exit_plan = current_pos.get('exit_plan') or _EMPTY
                 tp = exit_plan.get('profit_target', 'N/A')
                 sl = exit_plan.get('stop_loss', 'N/A')
                 trades.append({
@@ -173,7 +217,7 @@ class TradeAnalyzer:
                     'tp': tp,
                     'sl': sl,
                     'message': f"{model_id} {symbol} 新开仓: {direction} {abs(quantity)} (杠杆: {leverage}x, 进入: {entry_price}, 当前: {current_price}, 止盈: {tp}, 止损: {sl})",
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 })
                 return trades
             
@@ -185,12 +229,9 @@ class TradeAnalyzer:
                 last_current_price = last_pos.get('current_price', 0)
                 
                 # 判断原方向
-                if last_quantity > 0:
-                    direction = "买多"
-                else:
-                    direction = "卖空"
+                direction = _LONG if last_quantity > 0 else _SHORT
                 
-                exit_plan = last_pos.get('exit_plan', {})
+                exit_plan = last_pos.get('exit_plan') or _EMPTY
                 tp = exit_plan.get('profit_target', 'N/A')
                 sl = exit_plan.get('stop_loss', 'N/A')
                 trades.append({
@@ -205,7 +246,7 @@ class TradeAnalyzer:
                     'tp': tp,
                     'sl': sl,
                     'message': f"{model_id} {symbol} 已平仓 ({direction} {abs(last_quantity)}, 杠杆: {last_leverage}x, 进入: {last_entry_price}, 当前: {last_current_price}, 止盈: {tp}, 止损: {sl})",
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 })
                 return trades
             
@@ -226,26 +267,10 @@ class TradeAnalyzer:
                 quantity_change = current_quantity - last_quantity
                 
                 # 判断变化类型和方向
-                if quantity_change > 0:
-                    # 加仓
-                    if current_quantity > 0:
-                        action = "加仓买多"
-                    else:
-                        action = "加仓卖空"
-                elif quantity_change < 0:
-                    # 减仓
-                    if current_quantity > 0:
-                        action = "减仓买多"
-                    else:
-                        action = "减仓卖空"
-                else:
-                    # 杠杆变化但数量不变
-                    if current_quantity > 0:
-                        action = "调整买多杠杆"
-                    else:
-                        action = "调整卖空杠杆"
+                change_sign = (quantity_change > 0) - (quantity_change < 0)
+                action = _CHANGE_ACTIONS[change_sign, current_quantity > 0]
                 
-                exit_plan = current_pos.get('exit_plan', {})
+                exit_plan = current_pos.get('exit_plan') or _EMPTY
                 tp = exit_plan.get('profit_target', 'N/A')
                 sl = exit_plan.get('stop_loss', 'N/A')
                 trades.append({
@@ -267,7 +292,7 @@ class TradeAnalyzer:
                                                         abs(quantity_change), last_quantity, current_quantity,
                                                         last_leverage, current_leverage, 
                                                         last_entry_price, current_entry_price, current_price, tp, sl),
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 })
             
             return trades
@@ -319,9 +344,9 @@ class TradeAnalyzer:
         if not trades:
             return "暂无交易变化"
         
-        summary_lines = [f"检测到 {len(trades)} 个交易变化:"]
-        
-        for trade in trades:
-            summary_lines.append(f"• {trade['message']}")
+        # 超出上限的交易只显示数量，避免消息过长超出通知渠道的长度限制
+        limit = self.MAX_SUMMARY_TRADES
+        body = "\n".join(f"• {trade['message']}" for trade in trades[:limit])
+        tail = f"\n… 还有 {len(trades) - limit} 个交易变化" if len(trades) > limit else ""
         
-        return "\n".join(summary_lines)
+        return f"检测到 {len(trades)} 个交易变化:\n{body}{tail}"
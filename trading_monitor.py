@@ -3,40 +3,67 @@
 负责管理定时获取持仓数据和监控任务
 """
 import logging
-import schedule
 import time
-from typing import Optional, List, Dict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Optional, List, Dict
 
 from position_fetcher import PositionDataFetcher
-from trade_analyzer import TradeAnalyzer
-from wechat_notifier import WeChatNotifier
+from trade_analyzer import TradeAnalyzer, _position_fingerprint
+from wechat_notifier import WeChatNotifier, create_notify_session
 from config_manager import ConfigManager
 from bitget_trader_ccxt import BitgetTraderCCXT
 
 
+def _positions_fingerprint(positions: list) -> frozenset:
+    """
+    计算持仓数据指纹：只包含交易分析会比较的字段（模型、交易对及其数量和杠杆）
+    
+    价格、未实现盈亏等每次获取都会变化的字段不参与比较，指纹相同表示不会产生交易变化
+    
+    Args:
+        positions: 持仓数据中的 positions 列表
+        
+    Returns:
+        {(模型ID, {(交易对, (数量, 杠杆)), ...}), ...}
+    """
+    return frozenset(
+        (model.get('id'), frozenset(
+            (symbol, _position_fingerprint(pos))
+            for symbol, pos in (model.get('positions') or {}).items()
+        ))
+        for model in positions
+    )
+
+
 class TelegramNotifier:
     """Telegram 通知器"""
 
+    # (连接, 读取) 超时（秒），通常经代理访问，读取超时保持较长
+    REQUEST_TIMEOUT = (3, 15)
+
     def __init__(self, bot_token: str, chat_id: str, proxy: Optional[str] = None):
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.proxy = proxy
         self.logger = logging.getLogger(__name__)
+        self._url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+
+        # 代理地址只解析一次（"host:port"，未指定端口时默认 7890）
+        self._proxies = None
+        if proxy:
+            host, _, port = proxy.partition(":")
+            port = port or "7890"
+            self._proxies = {
+                "http": f"http://{host}:{port}",
+                "https": f"http://{host}:{port}",
+            }
+
+        # 复用连接，避免每条消息都重新建立 TCP/TLS 连接
+        self._http = create_notify_session()
 
     def _send_text(self, text: str) -> bool:
         try:
-            import requests
-
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            proxies = None
-            if self.proxy:
-                host, port = self.proxy.split(":") if ":" in self.proxy else (self.proxy, "7890")
-                proxies = {
-                    "http": f"http://{host}:{port}",
-                    "https": f"http://{host}:{port}",
-                }
-            resp = requests.post(url, json={"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}, timeout=15, proxies=proxies)
+            resp = self._http.post(self._url, json={"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}, timeout=self.REQUEST_TIMEOUT, proxies=self._proxies)
             resp.raise_for_status()
             data = resp.json()
             if not data.get("ok"):
@@ -57,6 +84,13 @@ class TelegramNotifier:
 class TradingMonitor:
     """交易监控器"""
     
+    # 监控任务执行间隔（秒）
+    MONITOR_INTERVAL = 60
+    
+    # 等待各通知渠道发送完成的最长时间（秒）
+    # 需覆盖最慢渠道含一次连接重试的耗时：Telegram 连接失败 3 + 重连 3 + 读取 15 = 21
+    NOTIFY_TIMEOUT = 25
+    
     def __init__(self, api_url: str, wechat_webhook_url: Optional[str] = None, telegram_bot_token: Optional[str] = None,
                  telegram_chat_id: Optional[str] = None, telegram_proxy: Optional[str] = None,
                  monitored_models: Optional[List[str]] = None, save_history_data: bool = False,
@@ -79,6 +113,11 @@ class TradingMonitor:
         self.wechat_webhook_url = wechat_webhook_url
         self.monitored_models = monitored_models
         
+        # 上次已处理（已重命名为 last.json）的持仓数据及其摘要
+        # 内存中的数据作为比较基准，last.json 只用于重启后恢复；摘要相同时跳过分析
+        self._last_data: Optional[Dict] = None
+        self._last_positions_fingerprint: Optional[frozenset] = None
+        
         # 初始化各个组件
         self.position_fetcher = PositionDataFetcher(api_url, save_history_data)
         self.trade_analyzer = TradeAnalyzer()
@@ -87,6 +126,9 @@ class TradingMonitor:
         if telegram_bot_token and telegram_chat_id:
             self.telegram_notifier = TelegramNotifier(telegram_bot_token, telegram_chat_id, telegram_proxy)
         
+        # 通知发送线程池：企业微信和 Telegram 并行发送，总耗时取较慢的一方
+        self._notify_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='notify')
+        
         # 初始化配置管理器
         self.config_manager = ConfigManager()
         
@@ -109,16 +151,53 @@ class TradingMonitor:
         else:
             self.logger = logging.getLogger(__name__)
             self.logger.info("Bitget API 未配置，自动跟单功能未启用")
+    
+    def _notify(self, send_wechat: Callable[[], bool], send_telegram: Callable[[], bool]) -> bool:
+        """
+        并行发送到已配置的通知渠道，最多等待 NOTIFY_TIMEOUT 秒
         
-        # 设置定时任务
-        self._setup_schedule()
+        Args:
+            send_wechat: 发送企业微信通知的函数
+            send_telegram: 发送 Telegram 通知的函数
+            
+        Returns:
+            至少一个渠道发送成功返回 True
+        """
+        futures = {}
+        if self.wechat_notifier:
+            futures['企业微信'] = self._notify_pool.submit(send_wechat)
+        if self.telegram_notifier:
+            futures['Telegram'] = self._notify_pool.submit(send_telegram)
+        if not futures:
+            return False
+        
+        done, _ = wait(futures.values(), timeout=self.NOTIFY_TIMEOUT)
+        sent_any = False
+        for channel, future in futures.items():
+            if future not in done:
+                self.logger.warning(f"{channel} 通知发送超时（{self.NOTIFY_TIMEOUT}s）")
+                continue
+            try:
+                if future.result():
+                    sent_any = True
+            except Exception as e:
+                self.logger.error(f"{channel} 通知发送失败: {e}")
+        return sent_any
     
-    def _setup_schedule(self):
-        """设置定时任务"""
-        # 每分钟执行一次监控任务
-        schedule.every().minute.do(self._monitor_task)
+    def _notify_plain(self, message: str) -> bool:
+        """
+        并行发送同一条消息到已配置的通知渠道
         
-        self.logger.info("定时任务已设置：每分钟执行一次监控")
+        Args:
+            message: 消息内容
+            
+        Returns:
+            至少一个渠道发送成功返回 True
+        """
+        return self._notify(
+            lambda: self.wechat_notifier.send_plain(message),
+            lambda: self.telegram_notifier.send_plain(message)
+        )
     
     def _execute_bitget_follow_trades(self, trades: List[Dict]) -> None:
         """
@@ -128,8 +207,11 @@ class TradingMonitor:
             trades: 交易变化列表
         """
         try:
+            # 本次跟单统一使用同一份配置快照（期间 Web 界面修改配置不会造成前后不一致）
+            config, whitelist_set = self.config_manager.get_snapshot()
+            
             # 检查是否启用自动跟单
-            if not self.config_manager.get_enabled():
+            if not config.get('enabled', False):
                 self.logger.debug("Bitget 自动跟单未启用，跳过")
                 return
             
@@ -139,23 +221,26 @@ class TradingMonitor:
                 return
             
             # 检查是否为模拟运行模式
-            is_dry_run = self.config_manager.is_dry_run()
+            is_dry_run = config.get('dry_run', False)
             if is_dry_run:
                 self.logger.info("🔸 模拟运行模式：只记录日志，不实际下单")
             
             # 过滤白名单模型
-            filtered_trades = []
-            whitelist = self.config_manager.get_whitelist_models()
+            whitelist = config.get('whitelist_models') or []
             
-            for trade in trades:
-                model_id = trade.get('model_id', '')
-                
-                # 检查是否在白名单中
-                if self.config_manager.is_model_whitelisted(model_id):
-                    filtered_trades.append(trade)
-                    self.logger.info(f"✅ 模型 {model_id} 在白名单中，准备跟单")
-                else:
-                    self.logger.info(f"⏭️ 模型 {model_id} 不在白名单中，跳过跟单")
+            # 白名单为空表示跟随所有模型
+            if whitelist_set:
+                filtered_trades = [t for t in trades if t.get('model_id', '') in whitelist_set]
+            else:
+                filtered_trades = list(trades)
+            
+            if self.logger.isEnabledFor(logging.INFO):
+                for trade in trades:
+                    model_id = trade.get('model_id', '')
+                    if not whitelist_set or model_id in whitelist_set:
+                        self.logger.info(f"✅ 模型 {model_id} 在白名单中，准备跟单")
+                    else:
+                        self.logger.info(f"⏭️ 模型 {model_id} 不在白名单中，跳过跟单")
             
             if not filtered_trades:
                 self.logger.info("没有符合白名单条件的交易，跳过跟单")
@@ -164,7 +249,7 @@ class TradingMonitor:
             self.logger.info(f"准备执行 {len(filtered_trades)} 个跟单交易（白名单: {whitelist or '全部'}）")
             
             # 更新缩放比例（可能在 Web 界面中被修改）
-            scale_ratio = self.config_manager.get_scale_ratio()
+            scale_ratio = config.get('scale_ratio', 0.1)
             self.bitget_trader.scale_ratio = scale_ratio
             
             # 执行跟单
@@ -178,15 +263,16 @@ class TradingMonitor:
                 result = self.bitget_trader.execute_trades(filtered_trades)
             
             # 发送跟单执行结果通知
-            if self.config_manager.load_config().get('notification_on_trade', True):
-                self._send_bitget_trade_notification(result, filtered_trades, is_dry_run)
+            if config.get('notification_on_trade', True):
+                self._send_bitget_trade_notification(result, filtered_trades, is_dry_run, scale_ratio)
             
             self.logger.info(f"Bitget 跟单执行完成: 成功 {result['success']}, 失败 {result['failed']}")
             
         except Exception as e:
             self.logger.error(f"执行 Bitget 跟单时发生错误: {e}")
     
-    def _send_bitget_trade_notification(self, result: Dict, trades: List[Dict], is_dry_run: bool) -> None:
+    def _send_bitget_trade_notification(self, result: Dict, trades: List[Dict], is_dry_run: bool,
+                                        scale_ratio: float) -> None:
         """
         发送 Bitget 跟单执行结果通知
         
@@ -194,16 +280,17 @@ class TradingMonitor:
             result: 执行结果 {'success': int, 'failed': int}
             trades: 交易列表
             is_dry_run: 是否为模拟运行
+            scale_ratio: 本次跟单实际使用的缩放比例（来自同一份配置快照）
         """
         try:
             mode_text = "【模拟运行】" if is_dry_run else ""
             message = (
                 f"🤖 **Bitget 跟单执行报告** {mode_text}\n\n"
-                f"⏰ 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"⏰ 时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"📊 跟单数量: {len(trades)}\n"
                 f"✅ 成功: {result['success']}\n"
                 f"❌ 失败: {result['failed']}\n"
-                f"📉 缩放比例: {self.config_manager.get_scale_ratio()}\n\n"
+                f"📉 缩放比例: {scale_ratio}\n\n"
             )
             
             # 添加交易详情
@@ -214,20 +301,7 @@ class TradingMonitor:
                 message += f"\n... 还有 {len(trades) - 5} 个交易"
             
             # 发送到各个通知渠道
-            if self.wechat_notifier:
-                try:
-                    import requests
-                    message_data = {"msgtype": "markdown", "markdown": {"content": message}}
-                    requests.post(self.wechat_webhook_url, json=message_data, 
-                                headers={'Content-Type': 'application/json'}, timeout=10)
-                except Exception as e:
-                    self.logger.error(f"发送 Bitget 跟单通知到企业微信失败: {e}")
-            
-            if self.telegram_notifier:
-                try:
-                    self.telegram_notifier.send_plain(message)
-                except Exception as e:
-                    self.logger.error(f"发送 Bitget 跟单通知到 Telegram 失败: {e}")
+            self._notify_plain(message)
                     
         except Exception as e:
             self.logger.error(f"发送 Bitget 跟单通知时发生错误: {e}")
@@ -251,12 +325,25 @@ class TradingMonitor:
                 self.logger.error("保存当前持仓数据失败")
                 return
             
-            # 3. 检查是否存在上次数据
-            last_data = self.position_fetcher.load_positions("last.json")
+            # 各模型的交易对及数量、杠杆与上次相同时不可能有交易变化，跳过读取历史数据和分析
+            fingerprint = _positions_fingerprint(current_data.get('positions', []))
+            if fingerprint == self._last_positions_fingerprint:
+                self.logger.info("持仓数量和杠杆与上次相同，无交易变化")
+                if self.position_fetcher.rename_current_to_last():
+                    self._last_data = current_data
+                self.logger.info("监控任务执行完成")
+                return
+            
+            # 3. 检查是否存在上次数据（启动后首次执行时从 last.json 恢复）
+            last_data = self._last_data
+            if last_data is None:
+                last_data = self.position_fetcher.load_positions("last.json")
             if not last_data:
                 self.logger.info("首次运行，无历史数据可比较")
                 # 将当前数据重命名为历史数据，为下次比较做准备
-                self.position_fetcher.rename_current_to_last()
+                if self.position_fetcher.rename_current_to_last():
+                    self._last_data = current_data
+                    self._last_positions_fingerprint = fingerprint
                 self.logger.info("监控任务执行完成（首次运行）")
                 return
             
@@ -276,22 +363,12 @@ class TradingMonitor:
                 summary = self.trade_analyzer.generate_trade_summary(trades)
                 self.logger.info(f"交易详情:\n{summary}")
                 
-                # 发送通知（各渠道按配置发送）
-                sent_any = False
-                content = self.trade_analyzer.generate_trade_summary(trades)
-                content = content + "\n\n🔗 全部持仓: http://alpha.insightpearl.com/"
-                if self.wechat_notifier:
-                    try:
-                        if self.wechat_notifier.send_trade_notification(trades):
-                            sent_any = True
-                    except Exception:
-                        self.logger.error("企业微信通知发送失败")
-                if self.telegram_notifier:
-                    try:
-                        if self.telegram_notifier.send_trade_notification(content):
-                            sent_any = True
-                    except Exception:
-                        self.logger.error("Telegram 通知发送失败")
+                # 发送通知（各渠道按配置发送，复用上面已生成的摘要）
+                content = summary + "\n\n🔗 全部持仓: http://alpha.insightpearl.com/"
+                sent_any = self._notify(
+                    lambda: self.wechat_notifier.send_trade_notification(trades),
+                    lambda: self.telegram_notifier.send_trade_notification(content)
+                )
                 if sent_any:
                     self.logger.info("交易通知发送完成（至少一个渠道成功）")
                 else:
@@ -303,7 +380,9 @@ class TradingMonitor:
                 self.logger.info("无交易变化")
             
             # 6. 将当前数据重命名为历史数据（只有在成功处理数据后才重命名）
-            self.position_fetcher.rename_current_to_last()
+            if self.position_fetcher.rename_current_to_last():
+                self._last_data = current_data
+                self._last_positions_fingerprint = fingerprint
             
             self.logger.info("监控任务执行完成")
             
@@ -321,27 +400,32 @@ class TradingMonitor:
         try:
             startup_message = (
                 "🚀 **AI交易监控系统启动**\n\n"
-                f"⏰ 启动时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"⏰ 启动时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"🔗 API地址: {self.api_url}\n"
                 f"👀 监控模型: {', '.join(self.monitored_models) if self.monitored_models else '全部模型'}\n\n"
                 "✅ 系统已开始监控，将每分钟检查一次持仓变化"
             )
-            if self.wechat_notifier:
-                import requests
-                message_data = {"msgtype": "markdown", "markdown": {"content": startup_message}}
-                requests.post(self.wechat_webhook_url, json=message_data, headers={'Content-Type': 'application/json'}, timeout=10)
-            if self.telegram_notifier:
-                self.telegram_notifier.send_plain(startup_message)
+            self._notify_plain(startup_message)
             self.logger.info("启动通知发送完成（按配置渠道）")
         except Exception as e:
             self.logger.warning(f"发送启动通知时发生错误: {e}")
         
-        # 开始定时任务循环
-        self.logger.info("定时任务循环已启动")
+        # 开始定时任务循环（按单调时钟计算截止时间，不受系统时间调整影响，也不会累积漂移）
+        self.logger.info(f"定时任务循环已启动：每 {self.MONITOR_INTERVAL} 秒执行一次监控")
         try:
+            interval = self.MONITOR_INTERVAL
+            next_run = time.monotonic() + interval
             while True:
-                schedule.run_pending()
-                time.sleep(1)
+                delay = next_run - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self._monitor_task()
+                
+                # 任务耗时超过一个周期时跳过错过的周期，不连续补跑
+                next_run += interval
+                now = time.monotonic()
+                while next_run <= now:
+                    next_run += interval
         except KeyboardInterrupt:
             self.logger.info("收到停止信号，正在关闭监控系统...")
             self._send_shutdown_notification()
@@ -354,16 +438,11 @@ class TradingMonitor:
         try:
             shutdown_message = (
                 "🛑 **AI交易监控系统关闭**\n\n"
-                f"⏰ 关闭时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+                f"⏰ 关闭时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
                 "系统已安全关闭"
             )
             
-            if self.wechat_notifier:
-                import requests
-                message_data = {"msgtype": "markdown", "markdown": {"content": shutdown_message}}
-                requests.post(self.wechat_webhook_url, json=message_data, headers={'Content-Type': 'application/json'}, timeout=10)
-            if self.telegram_notifier:
-                self.telegram_notifier.send_plain(shutdown_message)
+            self._notify_plain(shutdown_message)
             self.logger.info("关闭通知发送完成（按配置渠道）")
             
         except Exception as e:
@@ -374,17 +453,12 @@ class TradingMonitor:
         try:
             error_notification = (
                 "❌ **AI交易监控系统错误**\n\n"
-                f"⏰ 错误时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"⏰ 错误时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"🚨 错误信息: {error_message}\n\n"
                 "请检查系统状态"
             )
             
-            if self.wechat_notifier:
-                import requests
-                message_data = {"msgtype": "markdown", "markdown": {"content": error_notification}}
-                requests.post(self.wechat_webhook_url, json=message_data, headers={'Content-Type': 'application/json'}, timeout=10)
-            if self.telegram_notifier:
-                self.telegram_notifier.send_plain(error_notification)
+            self._notify_plain(error_notification)
             self.logger.info("错误通知发送完成（按配置渠道）")
             
         except Exception as e:
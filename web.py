@@ -1,10 +1,25 @@
+import functools
+import gzip
 import json
+import math
 import os
+import threading
 import time
-from flask import Flask, render_template_string, abort, request, url_for, jsonify, redirect
+from operator import itemgetter
+from flask import Flask, Response, render_template, abort, request, url_for, jsonify, redirect
 from config_manager import ConfigManager
 from dotenv import load_dotenv
 
+try:
+    import orjson  # 可选依赖，存在时用于更快的 JSON 解析
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # 可选依赖，存在时对支持的浏览器使用 br 压缩
+except ImportError:
+    brotli = None
+
 
 app = Flask(__name__)
 
@@ -15,91 +30,183 @@ load_dotenv()
 config_manager = ConfigManager()
 
 
-def load_last_json():
-    last_path = os.path.join(os.path.dirname(__file__), 'last.json')
-    if not os.path.exists(last_path):
-        abort(404, description='last.json not found')
-    with open(last_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+@functools.lru_cache(maxsize=4096)
+def _format_epoch(seconds):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(seconds))
 
 
 def format_ts(ts):
+    # 持仓的开仓时间在多次快照间基本不变，格式化结果按时间戳缓存
     try:
-        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(float(ts)))
+        return _format_epoch(float(ts))
     except Exception:
         return '-'
 
 
-@app.route('/')
-def index():
-    data = load_last_json()
+LAST_JSON_PATH = os.path.join(os.path.dirname(__file__), 'last.json')
+LAST_JSON_WATCH_INTERVAL = 2  # 后台轮询 last.json 的间隔（秒）
+_last_json_watcher = None  # 后台预加载线程
+_last_json_watcher_lock = threading.Lock()
+
+# last.json 解析结果缓存：文件 (mtime, size) 不变时直接复用，监控程序每分钟替换一次文件
+_last_json_lock = threading.Lock()
+_last_json_cache = (None, None, None)  # ((mtime_ns, size), data, view)，整体替换保证读取时三者一致
+
+
+def _sign_class(value):
+    """盈亏数值对应的样式类名"""
+    return 'pos' if value > 0 else ('neg' if value < 0 else 'zero')
+
+
+def _format_position_cells(pos):
+    """
+    预先格式化持仓行各单元格的显示文本，模板直接输出
+    
+    Args:
+        pos: 单个持仓数据（原地写入 *_fmt/*_cls 字段）
+    """
+    upnl = pos.get('unrealized_pnl', 0.0) or 0.0
+    cpnl = pos.get('closed_pnl', 0.0) or 0.0
+    exit_plan = pos.get('exit_plan') or {}
+    tp = exit_plan.get('profit_target')
+    sl = exit_plan.get('stop_loss')
+    et = pos.get('entry_time')
+    pos['entry_price_fmt'] = '%.6g' % (pos.get('entry_price') or 0)
+    pos['current_price_fmt'] = '%.6g' % (pos.get('current_price') or 0)
+    pos['margin_fmt'] = '%.2f' % (pos.get('margin', 0.0) or 0.0)
+    pos['upnl_fmt'] = '%.2f' % upnl
+    pos['upnl_cls'] = _sign_class(upnl)
+    pos['cpnl_fmt'] = '%.2f' % cpnl
+    pos['cpnl_cls'] = _sign_class(cpnl)
+    pos['tp_fmt'] = '' if tp is None else str(tp)
+    pos['sl_fmt'] = '' if sl is None else str(sl)
+    pos['entry_time_fmt'] = format_ts(et) if et else '-'
+
+
+def _build_index_view(data):
+    """
+    预计算持仓页面用到的派生数据（只在 last.json 变化时执行一次）
+    
+    会在解析结果上直接写入各模型的 realized_pnl（统一为 float）/unrealized_pnl/total_pnl/sorted_symbols 及各持仓格式化好的单元格文本
+    
+    Args:
+        data: 刚解析的 last.json 数据（尚未共享给其他请求）
+        
+    Returns:
+        {'models': 按已实现盈亏降序排列的模型列表, 'sorted_symbols': 全部合约对（排序）,
+         'model_ids': 模型 ID 列表（保持原顺序）}
+    """
     # Expect data['positions'] to be a list of model snapshots
     models = data.get('positions', [])
+    all_symbols = set()
     
     # Calculate unrealized and total PnL for each model
     for m in models:
-        realized_pnl = m.get('realized_pnl', 0.0) or 0.0
-        unrealized_pnl = 0.0
-        positions = m.get('positions', {})
+        realized_pnl = m['realized_pnl'] = float(m.get('realized_pnl') or 0.0)
+        positions = m.get('positions') or {}
         for pos in positions.values():
-            unrealized_pnl += (pos.get('unrealized_pnl', 0.0) or 0.0)
+            _format_position_cells(pos)
+        unrealized_pnl = math.fsum((pos.get('unrealized_pnl') or 0.0) for pos in positions.values())
         m['unrealized_pnl'] = unrealized_pnl
         m['total_pnl'] = realized_pnl + unrealized_pnl
+        # 每个表格只渲染该模型实际持有的合约对
+        m['sorted_symbols'] = sorted(positions)
+        all_symbols.update(positions.keys())
     
-    # Sort by realized_pnl descending
-    models = sorted(models, key=lambda m: (m.get('realized_pnl') or 0.0), reverse=True)
+    return {
+        # Sort by realized_pnl descending
+        'models': sorted(models, key=itemgetter('realized_pnl'), reverse=True),
+        # All symbols observed across models, sorted for header consistency
+        'sorted_symbols': sorted(all_symbols),
+        # Model ids in file order, for the settings page
+        'model_ids': [m.get('id') for m in models if m.get('id')],
+    }
 
-    # Extract a sorted list of all symbols observed across models for header consistency
-    all_symbols = set()
-    for m in models:
-        for sym in (m.get('positions') or {}).keys():
-            all_symbols.add(sym)
-    sorted_symbols = sorted(all_symbols)
 
-    # i18n strings
-    lang = request.args.get('lang', 'zh')
-    is_en = (lang == 'en')
-    t = {
-        'title': 'Alpha Arena 持仓监控' if not is_en else 'Alpha Arena Positions Monitor',
-        'data_time': '数据时间' if not is_en else 'Data Time',
-        'auto_refresh': '自动每15秒刷新' if not is_en else 'Auto refresh every 15s',
-        'delay': '提示：与官网数据存在约1分钟延时' if not is_en else 'Note: ~1 minute delay vs. official site',
-        'model': '模型' if not is_en else 'Model',
-        'rpnl': '已实现盈亏' if not is_en else 'Realized PnL',
-        'urpnl': '未实现盈亏' if not is_en else 'Unrealized PnL',
-        'tpnl': '总盈亏' if not is_en else 'Total PnL',
-        'pair': '合约对' if not is_en else 'Pair',
-        'qty': '数量' if not is_en else 'Qty',
-        'lev': '杠杆' if not is_en else 'Lev',
-        'entry': '开仓价' if not is_en else 'Entry',
-        'price': '当前价' if not is_en else 'Price',
-        'margin': '保证金' if not is_en else 'Margin',
-        'upnl': '浮动盈亏' if not is_en else 'U-PnL',
-        'cpnl': '平仓盈亏' if not is_en else 'C-PnL',
-        'tp': '止盈' if not is_en else 'TP',
-        'sl': '止损' if not is_en else 'SL',
-        'entry_time': '进入时间' if not is_en else 'Entry Time',
-        'file': '文件' if not is_en else 'File',
-        'size': '大小' if not is_en else 'Size',
-        'toggle': 'English' if not is_en else '中文',
-        'contact': '联系方式' if not is_en else 'Contact',
-        'nof1': 'nof1.ai' if not is_en else 'nof1.ai',
-        'wechat_mp': '公众号:远见拾贝' if not is_en else 'WeChat MP',
-        'x': 'X' if is_en else 'X',
-        'github': 'Github' if not is_en else 'GitHub',
-        'site': '网站' if not is_en else 'Site',
-        'disclaimer': '声明：本网站仅供学习和研究使用，不构成投资建议。所有交易决策由用户自行承担风险。作者对任何投资损失不承担责任。如果您发现本网站内容侵犯了您的权益，请联系我们立即处理。' if not is_en else 'Disclaimer: This website is for learning and research only, and does not constitute investment advice. All trading decisions are at your own risk. The author is not responsible for any investment losses. If you find any infringement, please contact us immediately.',
-    }
+def _load_last_json_cached():
+    """
+    读取 last.json 及其页面派生数据，文件未变化时复用上次的结果（各请求共享，只读）
+    
+    Returns:
+        ((mtime_ns, size), 解析后的数据, 页面派生数据)
+    """
+    global _last_json_cache
+    try:
+        st = os.stat(LAST_JSON_PATH)
+    except FileNotFoundError:
+        abort(404, description='last.json not found')
+    key = (st.st_mtime_ns, st.st_size)
+    
+    cached = _last_json_cache
+    if cached[0] == key:
+        return cached
+    
+    with _last_json_lock:
+        cached = _last_json_cache
+        if cached[0] == key:
+            return cached
+        with open(LAST_JSON_PATH, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        _last_json_cache = (key, data, _build_index_view(data))
+        return _last_json_cache
+
 
-    # HTML template with auto refresh every 15 seconds
-    template = r"""
+def _watch_last_json(interval):
+    """
+    后台轮询 last.json，文件被替换后立即解析并预计算页面视图
+    
+    请求线程只需比对缓存键，不再承担文件变化后第一次请求的解析开销
+    
+    Args:
+        interval: 轮询间隔（秒）
+    """
+    while True:
+        try:
+            _load_last_json_cached()
+        except Exception:
+            # 文件暂不存在或内容不完整，下一轮再试
+            pass
+        time.sleep(interval)
+
+
+def start_last_json_watcher(interval=LAST_JSON_WATCH_INTERVAL):
+    """启动 last.json 后台预加载线程（守护线程，每个进程只启动一次）"""
+    global _last_json_watcher
+    with _last_json_watcher_lock:
+        if _last_json_watcher is None:
+            _last_json_watcher = threading.Thread(target=_watch_last_json, args=(interval,),
+                                                  name='last-json-watcher', daemon=True)
+            _last_json_watcher.start()
+    return _last_json_watcher
+
+
+@app.before_request
+def _ensure_last_json_watcher():
+    # 在处理请求的进程中启动（gunicorn --preload 时主进程导入模块后 fork，线程不会带到 worker 中）
+    if _last_json_watcher is None:
+        start_last_json_watcher()
+
+
+def _last_json_version(key):
+    """last.json 版本号（由缓存键 (mtime_ns, size) 生成）"""
+    return '%x-%x' % key
+
+
+def load_last_json():
+    """读取 last.json，文件未变化时复用上次的解析结果（各请求共享，只读）"""
+    return _load_last_json_cached()[1]
+
+
+# 持仓页面模板（每 15 秒自动刷新）
+_INDEX_TEMPLATE = r"""
 <!doctype html>
 <html lang="zh-CN">
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
   <title>持仓监控</title>
-  <meta http-equiv="refresh" content="15">
+  <noscript><meta http-equiv="refresh" content="15"></noscript>
   <style>
     body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; margin: 20px; }
     h1 { font-size: 20px; margin: 0 0 16px; }
@@ -117,8 +224,20 @@ def index():
     .spacer { height: 28px; }
   </style>
   <script>
-    // In case meta refresh is blocked, fallback to JS reload
-    setTimeout(function(){ window.location.reload(); }, 15000);
+    // 每 15 秒查询一次数据版本（未变化时服务端返回 304），只在 last.json 更新后刷新页面；不支持 fetch 时退回定时刷新
+    (function(){
+      var version = '{{ version }}';
+      if (window.fetch) {
+        setInterval(function(){
+          fetch('{{ url_for('api_version') }}', {cache: 'no-cache'})
+            .then(function(r){ return r.ok ? r.json() : null; })
+            .then(function(d){ if (d && d.version !== version) { window.location.reload(); } })
+            .catch(function(){});
+        }, 15000);
+      } else {
+        setTimeout(function(){ window.location.reload(); }, 15000);
+      }
+    })();
   </script>
   </head>
 <body>
@@ -157,37 +276,27 @@ def index():
         </tr>
       </thead>
       <tbody>
-        {% set pos_map = m.get('positions') or {} %}
-        {% for sym in sorted_symbols %}
-          {% set p = pos_map.get(sym) %}
-          {% if p %}
-            {% set upnl = p.get('unrealized_pnl', 0.0) or 0.0 %}
-            {% set cpnl = p.get('closed_pnl', 0.0) or 0.0 %}
-            <tr>
-              <td class="sym">{{ sym }}</td>
-              <td>{{ p.get('quantity') }}</td>
-              <td>{{ p.get('leverage') }}</td>
-              <td>{{ '%.6g' % (p.get('entry_price') or 0) }}</td>
-              <td>{{ '%.6g' % (p.get('current_price') or 0) }}</td>
-              <td>{{ '%.2f' % (p.get('margin', 0.0) or 0.0) }}</td>
-              <td class="{{ 'pos' if upnl>0 else ('neg' if upnl<0 else 'zero') }}">{{ '%.2f' % upnl }}</td>
-              <td class="{{ 'pos' if cpnl>0 else ('neg' if cpnl<0 else 'zero') }}">{{ '%.2f' % cpnl }}</td>
-              <td>{% if p.get('exit_plan') %}{{ p['exit_plan'].get('profit_target') }}{% endif %}</td>
-              <td>{% if p.get('exit_plan') %}{{ p['exit_plan'].get('stop_loss') }}{% endif %}</td>
-              <td>{% set et = p.get('entry_time') %}{{ format_ts(et) if et else '-' }}</td>
-            </tr>
-          {% else %}
-            <tr>
-              <td class="sym">{{ sym }}</td>
-              <td colspan="11" style="text-align:center;color:#999">—</td>
-            </tr>
-          {% endif %}
+        {% for sym in m.sorted_symbols %}
+          {% set p = m.positions[sym] %}
+          <tr>
+            <td class="sym">{{ sym }}</td>
+            <td>{{ p.quantity }}</td>
+            <td>{{ p.leverage }}</td>
+            <td>{{ p.entry_price_fmt }}</td>
+            <td>{{ p.current_price_fmt }}</td>
+            <td>{{ p.margin_fmt }}</td>
+            <td class="{{ p.upnl_cls }}">{{ p.upnl_fmt }}</td>
+            <td class="{{ p.cpnl_cls }}">{{ p.cpnl_fmt }}</td>
+            <td>{{ p.tp_fmt }}</td>
+            <td>{{ p.sl_fmt }}</td>
+            <td>{{ p.entry_time_fmt }}</td>
+          </tr>
         {% endfor %}
       </tbody>
     </table>
   {% endfor %}
 
-  <div class="meta">{{ t['file'] }}：last.json &nbsp; {{ t['size'] }}：{{ (json_str|length) }} {{ 'bytes' if is_en else '字节' }}</div>
+  <div class="meta">{{ t['file'] }}：last.json &nbsp; {{ t['size'] }}：{{ json_size }} {{ 'bytes' if is_en else '字节' }}</div>
 
   <div style="margin-top: 40px; padding: 20px; background: #f9f9f9; border-radius: 4px; font-size: 12px; line-height: 1.8; color: #666;">
     {{ t['disclaimer'] }}
@@ -196,63 +305,8 @@ def index():
 </html>
 """
 
-    json_str = json.dumps(data, ensure_ascii=False)
-    return render_template_string(
-        template,
-        data=data,
-        models=models,
-        sorted_symbols=sorted_symbols,
-        json_str=json_str,
-        format_ts=format_ts,
-        t=t,
-        is_en=is_en,
-    )
-
-
-@app.route('/settings')
-def settings():
-    """配置页面"""
-    config = config_manager.load_config()
-    
-    # 获取可用的模型列表（从 last.json）
-    available_models = []
-    try:
-        data = load_last_json()
-        models = data.get('positions', [])
-        available_models = [m.get('id') for m in models if m.get('id')]
-    except Exception:
-        pass
-    
-    # 获取 Bitget API 配置状态
-    api_configured = bool(os.getenv('BITGET_API_KEY') and 
-                         os.getenv('BITGET_SECRET_KEY') and 
-                         os.getenv('BITGET_PASSPHRASE'))
-    
-    lang = request.args.get('lang', 'zh')
-    is_en = (lang == 'en')
-    
-    t = {
-        'title': 'Bitget 跟单设置' if not is_en else 'Bitget Follow Settings',
-        'enabled': '启用自动跟单' if not is_en else 'Enable Auto Follow',
-        'disabled': '已禁用' if not is_en else 'Disabled',
-        'scale_ratio': '缩放比例' if not is_en else 'Scale Ratio',
-        'scale_ratio_desc': '将原始交易量按此比例缩放（如 0.1 表示缩小到 10%）' if not is_en else 'Scale original trade size by this ratio (e.g., 0.1 means 10%)',
-        'whitelist': '白名单模型' if not is_en else 'Whitelist Models',
-        'whitelist_desc': '只跟随选中的模型交易，留空则跟随所有模型' if not is_en else 'Only follow selected models, leave empty to follow all',
-        'max_amount': '单笔最大金额 (USDT)' if not is_en else 'Max Single Trade (USDT)',
-        'dry_run': '模拟运行模式' if not is_en else 'Dry Run Mode',
-        'dry_run_desc': '只记录日志不实际下单' if not is_en else 'Log only, no actual orders',
-        'notification': '交易后发送通知' if not is_en else 'Notify After Trade',
-        'api_status': 'API 配置状态' if not is_en else 'API Status',
-        'api_ok': '已配置' if not is_en else 'Configured',
-        'api_not': '未配置' if not is_en else 'Not Configured',
-        'api_hint': '请在 .env 文件中配置 BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE' if not is_en else 'Please configure BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE in .env file',
-        'save': '保存配置' if not is_en else 'Save',
-        'back': '返回持仓页面' if not is_en else 'Back to Positions',
-        'risk_warning': '⚠️ 风险提示：所有仓位都会强制设置止盈止损，若源交易缺少止盈止损将拒绝跟单' if not is_en else '⚠️ Risk Warning: All positions require stop-loss and take-profit. Trades without SL/TP will be rejected',
-    }
-    
-    template = r"""
+# 配置页面模板
+_SETTINGS_TEMPLATE = r"""
 <!doctype html>
 <html lang="zh-CN">
 <head>
@@ -418,9 +472,234 @@ def settings():
 </body>
 </html>
 """
+
+# 持仓页面文案（按语言预先构建，各请求共享，只读）
+_INDEX_TEXT_ZH = {
+    'title': 'Alpha Arena 持仓监控',
+    'data_time': '数据时间',
+    'auto_refresh': '数据更新后自动刷新',
+    'delay': '提示：与官网数据存在约1分钟延时',
+    'model': '模型',
+    'rpnl': '已实现盈亏',
+    'urpnl': '未实现盈亏',
+    'tpnl': '总盈亏',
+    'pair': '合约对',
+    'qty': '数量',
+    'lev': '杠杆',
+    'entry': '开仓价',
+    'price': '当前价',
+    'margin': '保证金',
+    'upnl': '浮动盈亏',
+    'cpnl': '平仓盈亏',
+    'tp': '止盈',
+    'sl': '止损',
+    'entry_time': '进入时间',
+    'file': '文件',
+    'size': '大小',
+    'toggle': 'English',
+    'contact': '联系方式',
+    'nof1': 'nof1.ai',
+    'wechat_mp': '公众号:远见拾贝',
+    'x': 'X',
+    'github': 'Github',
+    'site': '网站',
+    'disclaimer': '声明：本网站仅供学习和研究使用，不构成投资建议。所有交易决策由用户自行承担风险。作者对任何投资损失不承担责任。如果您发现本网站内容侵犯了您的权益，请联系我们立即处理。',
+}
+
+_INDEX_TEXT_EN = {
+    'title': 'Alpha Arena Positions Monitor',
+    'data_time': 'Data Time',
+    'auto_refresh': 'Auto refresh on data update',
+    'delay': 'Note: ~1 minute delay vs. official site',
+    'model': 'Model',
+    'rpnl': 'Realized PnL',
+    'urpnl': 'Unrealized PnL',
+    'tpnl': 'Total PnL',
+    'pair': 'Pair',
+    'qty': 'Qty',
+    'lev': 'Lev',
+    'entry': 'Entry',
+    'price': 'Price',
+    'margin': 'Margin',
+    'upnl': 'U-PnL',
+    'cpnl': 'C-PnL',
+    'tp': 'TP',
+    'sl': 'SL',
+    'entry_time': 'Entry Time',
+    'file': 'File',
+    'size': 'Size',
+    'toggle': '中文',
+    'contact': 'Contact',
+    'nof1': 'nof1.ai',
+    'wechat_mp': 'WeChat MP',
+    'x': 'X',
+    'github': 'GitHub',
+    'site': 'Site',
+    'disclaimer': 'Disclaimer: This website is for learning and research only, and does not constitute investment advice. All trading decisions are at your own risk. The author is not responsible for any investment losses. If you find any infringement, please contact us immediately.',
+}
+
+# 配置页面文案（按语言预先构建，各请求共享，只读）
+_SETTINGS_TEXT_ZH = {
+    'title': 'Bitget 跟单设置',
+    'enabled': '启用自动跟单',
+    'disabled': '已禁用',
+    'scale_ratio': '缩放比例',
+    'scale_ratio_desc': '将原始交易量按此比例缩放（如 0.1 表示缩小到 10%）',
+    'whitelist': '白名单模型',
+    'whitelist_desc': '只跟随选中的模型交易，留空则跟随所有模型',
+    'max_amount': '单笔最大金额 (USDT)',
+    'dry_run': '模拟运行模式',
+    'dry_run_desc': '只记录日志不实际下单',
+    'notification': '交易后发送通知',
+    'api_status': 'API 配置状态',
+    'api_ok': '已配置',
+    'api_not': '未配置',
+    'api_hint': '请在 .env 文件中配置 BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE',
+    'save': '保存配置',
+    'back': '返回持仓页面',
+    'risk_warning': '⚠️ 风险提示：所有仓位都会强制设置止盈止损，若源交易缺少止盈止损将拒绝跟单',
+}
+
+_SETTINGS_TEXT_EN = {
+    'title': 'Bitget Follow Settings',
+    'enabled': 'Enable Auto Follow',
+    'disabled': 'Disabled',
+    'scale_ratio': 'Scale Ratio',
+    'scale_ratio_desc': 'Scale original trade size by this ratio (e.g., 0.1 means 10%)',
+    'whitelist': 'Whitelist Models',
+    'whitelist_desc': 'Only follow selected models, leave empty to follow all',
+    'max_amount': 'Max Single Trade (USDT)',
+    'dry_run': 'Dry Run Mode',
+    'dry_run_desc': 'Log only, no actual orders',
+    'notification': 'Notify After Trade',
+    'api_status': 'API Status',
+    'api_ok': 'Configured',
+    'api_not': 'Not Configured',
+    'api_hint': 'Please configure BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE in .env file',
+    'save': 'Save',
+    'back': 'Back to Positions',
+    'risk_warning': '⚠️ Risk Warning: All positions require stop-loss and take-profit. Trades without SL/TP will be rejected',
+}
+
+# 渲染好的持仓页面：语言 -> ((mtime_ns, size), html, {编码: 压缩后的内容})
+_index_html_cache = {}
+
+# 页面压缩方式（按优先级）
+_PAGE_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _compress_page(html, encoding):
+    """按指定编码压缩页面"""
+    data = html.encode('utf-8')
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _page_response(html, encoded, key, lang):
+    """
+    按客户端 Accept-Encoding 返回压缩后的页面，并支持条件请求（ETag/Last-Modified）
+    
+    Args:
+        html: 渲染好的页面
+        encoded: 该版本页面的压缩结果缓存 {编码: bytes}，同一版本每种编码只压缩一次
+        key: 页面对应的 last.json 版本 (mtime_ns, size)
+        lang: 页面语言
+        
+    Returns:
+        Response（last.json 未变化时为 304）
+    """
+    accept = request.accept_encodings
+    for encoding in _PAGE_ENCODINGS:
+        if encoding in accept:
+            body = encoded.get(encoding)
+            if body is None:
+                body = encoded[encoding] = _compress_page(html, encoding)
+            response = Response(body, mimetype='text/html')
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        encoding = 'identity'
+        response = Response(html, mimetype='text/html')
+    response.vary.add('Accept-Encoding')
+    response.set_etag('%s-%s-%s' % (_last_json_version(key), lang, encoding))
+    response.last_modified = key[0] / 1e9
+    return response.make_conditional(request)
+
+# 模板只在启动时编译一次，各请求直接复用（render_template_string 每次都会重新解析编译）
+_index_template = app.jinja_env.from_string(_INDEX_TEMPLATE)
+_settings_template = app.jinja_env.from_string(_SETTINGS_TEMPLATE)
+
+
+@app.route('/')
+def index():
+    # 盈亏、排序和合约对列表在 last.json 变化时已预先算好
+    key, data, view = _load_last_json_cached()
+
+    # i18n strings
+    is_en = (request.args.get('lang', 'zh') == 'en')
+    lang = 'en' if is_en else 'zh'
+    
+    # 页面内容只取决于 last.json 和语言，文件未变化时直接返回上次渲染好的 HTML
+    cached_key, html, encoded = _index_html_cache.get(lang, (None, None, None))
+    if cached_key == key:
+        return _page_response(html, encoded, key, lang)
+    
+    t = _INDEX_TEXT_EN if is_en else _INDEX_TEXT_ZH
+
+    # 文件大小直接取自缓存键，无需为显示大小把数据重新序列化一遍
+    html = render_template(
+        _index_template,
+        data=data,
+        models=view['models'],
+        json_size=key[1],
+        version=_last_json_version(key),
+        t=t,
+        is_en=is_en,
+        lang=lang,
+    )
+    encoded = {}
+    _index_html_cache[lang] = (key, html, encoded)
+    return _page_response(html, encoded, key, lang)
+
+
+@app.route('/api/version')
+def api_version():
+    """last.json 当前版本，页面定时轮询，版本变化时才刷新（未变化时返回 304）"""
+    try:
+        st = os.stat(LAST_JSON_PATH)
+    except FileNotFoundError:
+        abort(404, description='last.json not found')
+    version = _last_json_version((st.st_mtime_ns, st.st_size))
+    response = jsonify({'version': version})
+    response.set_etag(version)
+    return response.make_conditional(request)
+
+
+@app.route('/settings')
+def settings():
+    """配置页面"""
+    config = config_manager.load_config()
+    
+    # 获取可用的模型列表（从 last.json 的缓存视图）
+    available_models = []
+    try:
+        available_models = _load_last_json_cached()[2]['model_ids']
+    except Exception:
+        pass
     
-    return render_template_string(
-        template,
+    # 获取 Bitget API 配置状态
+    api_configured = bool(os.getenv('BITGET_API_KEY') and 
+                         os.getenv('BITGET_SECRET_KEY') and 
+                         os.getenv('BITGET_PASSPHRASE'))
+    
+    lang = request.args.get('lang', 'zh')
+    is_en = (lang == 'en')
+    
+    t = _SETTINGS_TEXT_EN if is_en else _SETTINGS_TEXT_ZH
+    
+    return render_template(
+        _settings_template,
         config=config,
         available_models=available_models,
         api_configured=api_configured,
@@ -436,10 +715,13 @@ def api_config():
     if request.method == 'GET':
         # 获取配置
         config = config_manager.load_config()
-        return jsonify({
+        response = jsonify({
             'success': True,
             'config': config
         })
+        # 配置未变化时返回 304
+        response.add_etag()
+        return response.make_conditional(request)
     
     elif request.method == 'POST':
         # 更新配置
@@ -462,9 +744,35 @@ def api_config():
             }), 500
 
 
+# 序列化好的持仓数据：((mtime_ns, size), body)
+_positions_json_cache = (None, None)
+
+
+@app.route('/api/positions')
+def api_positions():
+    """持仓数据 API（按已实现盈亏排序、单元格已格式化），供前端自行渲染"""
+    global _positions_json_cache
+    key, data, view = _load_last_json_cached()
+    cached_key, body = _positions_json_cache
+    if cached_key != key:
+        payload = {
+            'success': True,
+            'fetch_time': data.get('fetch_time') or data.get('timestamp'),
+            'sorted_symbols': view['sorted_symbols'],
+            'models': view['models'],
+        }
+        if orjson is not None:
+            body = orjson.dumps(payload)
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        _positions_json_cache = (key, body)
+    return Response(body, mimetype='application/json')
+
+
 if __name__ == '__main__':
     # Allow host binding via env var if needed
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', '5010'))
     debug = os.getenv('FLASK_DEBUG', '0') == '1'
-    app.run(host=host, port=port, debug=debug)
+    # 开发服务器，多线程处理请求；生产环境可用 gunicorn 部署（见 README）
+    app.run(host=host, port=port, debug=debug, threaded=True)
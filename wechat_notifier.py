@@ -5,10 +5,39 @@
 import json
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
+# 企业微信请求的 (连接, 读取) 超时（秒）
+WECHAT_REQUEST_TIMEOUT = (3, 10)
+
+
+def create_notify_session() -> requests.Session:
+    """
+    创建通知发送用的 HTTP 会话（复用连接，建立连接失败时重试一次）
+    
+    只重试建立连接失败（消息一定未发出）；502/503/504 和读取超时不重试，网关可能已经转发了消息，
+    重发会导致重复通知。429 也不重试：限流时间通常长于通知等待时间，立即重试只会再次被限流
+    
+    Returns:
+        配置好的 requests.Session
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=1, connect=1, read=0, status=0,
+        backoff_factor=0.3,
+        allowed_methods=frozenset({'POST'}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 class WeChatNotifier:
     """企业微信通知器"""
     
@@ -21,6 +50,9 @@ class WeChatNotifier:
         """
         self.webhook_url = webhook_url
         self.logger = logging.getLogger(__name__)
+        
+        # 复用连接，避免每条消息都重新建立 TCP/TLS 连接
+        self._http = create_notify_session()
     
     def _get_model_link(self, model_id: str) -> str:
         """
@@ -148,11 +180,11 @@ class WeChatNotifier:
             }
             
             # 发送请求
-            response = requests.post(
+            response = self._http.post(
                 self.webhook_url,
                 json=message_data,
                 headers={'Content-Type': 'application/json'},
-                timeout=10
+                timeout=WECHAT_REQUEST_TIMEOUT
             )
             
             # 检查响应
@@ -173,6 +205,18 @@ class WeChatNotifier:
             self.logger.error(f"发送企业微信消息时发生未知错误: {e}")
             return False
     
+    def send_plain(self, content: str) -> bool:
+        """
+        发送已格式化好的 markdown 消息（启动、关闭、错误、跟单报告等）
+        
+        Args:
+            content: 消息内容
+            
+        Returns:
+            发送成功返回True，失败返回False
+        """
+        return self._send_message(content)
+    
     def send_test_message(self) -> bool:
         """
         发送测试消息